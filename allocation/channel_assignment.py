@@ -1,4 +1,5 @@
 import random
+import numpy as np
 
 
 class ChannelAssigner:
@@ -26,12 +27,22 @@ class ChannelAssigner:
     Updated at: 2025/4/1
     """
 
+    NUM_CHANNELS_802_11b = 14
+
     def __init__(self, simulator, my_drone, mode="IEEE_802_11b"):
         self.simulator = simulator
         self.my_drone = my_drone
         self.mode = mode
         self.rng_channel_assignment = random.Random(self.my_drone.identifier + self.my_drone.simulator.seed + 66)
 
+        # overlap of every pair of sub-channels, indexed by channel id, computed once instead of per packet
+        if self.mode == "IEEE_802_11b":
+            channels = range(self.NUM_CHANNELS_802_11b + 1)  # index 0 is unused, channel ids start from 1
+            self.adjacency_table = np.array([[self.adjacent_channel_interference_check(i, j) for j in channels]
+                                             for i in channels], dtype=bool)
+        else:
+            self.adjacency_table = None
+
     def _without_assignment(self):
         """This will be served as a baseline"""
         if self.mode == "IEEE_802_11b":
@@ -63,5 +74,25 @@ class ChannelAssigner:
             print('Currently not support~ We are working on it.')
             return -1
 
+    def adjacent_channel_interference_matrix(self, channel_ids1, channel_ids2):
+        """
+        Vectorized version of "adjacent_channel_interference_check"
+
+        Parameters:
+            channel_ids1: array of M sub-channel ids
+            channel_ids2: array of K sub-channel ids
+
+        Returns:
+            (M, K) boolean array, entry [i, j] tells if channel_ids1[i] and channel_ids2[j] are overlapping
+        """
+        channel_ids1 = np.asarray(channel_ids1)
+        channel_ids2 = np.asarray(channel_ids2)
+        if self.adjacency_table is not None:
+            return self.adjacency_table[channel_ids1[:, None], channel_ids2[None, :]]
+        else:
+            print('Currently not support~ We are working on it.')
+            # same as the scalar check, whose -1 result counts as overlapping
+            return np.ones((len(channel_ids1), len(channel_ids2)), dtype=bool)
+
     def channel_assign(self):
         return self._random_ondemand_assignment()
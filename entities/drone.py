@@ -3,6 +3,7 @@ import numpy as np
 import random
 import math
 import queue
+from bisect import bisect_left
 from simulator.log import logger
 from entities.packet import DataPacket
 from routing.dsdv.dsdv import Dsdv
@@ -103,6 +104,9 @@ class Drone:
         self.mac_process_count = 0
         self.enable_blocking = 1  # enable "stop-and-wait" protocol
 
+        # created before the routing protocol, which binds "channel_assign" once at construction
+        self.channel_assigner = ChannelAssigner(self.simulator, self)
+
         #######################################################
         #self.routing_protocol = Dsdv(self.simulator, self)
         from routing.olsr.olsr import Olsr
@@ -116,8 +120,6 @@ class Drone:
         self.residual_energy = config.INITIAL_ENERGY
         self.sleep = False
 
-        self.channel_assigner = ChannelAssigner(self.simulator, self)
-
         self.env.process(self.generate_data_packet())
         self.env.process(self.feed_packet())
         self.env.process(self.receive())
@@ -345,25 +347,22 @@ class Drone:
                 flag, all_drones_send_to_me, time_span, potential_packet = self.trigger()
 
                 if flag:
-                    # find the transmitters of all packets currently transmitted on the channel
-                    transmitting_node_list = []
+                    # find the transmitters of all packets currently transmitted on the channel,
+                    # the set removes the duplicates
+                    transmitting_nodes = set()
                     for drone in self.simulator.drones:
-                        for item in drone.inbox:
-                            packet = item[0]
-                            insertion_time = item[1]
-                            transmitter = item[2]
-                            channel_used = item[4]
+                        inbox = drone.inbox
+                        for packet, insertion_time, transmitter, channel_used in zip(inbox.packet, inbox.send_time,
+                                                                                     inbox.src, inbox.channel):
                             transmitting_time = packet.packet_length / config.BIT_RATE * 1e6
                             interval = [insertion_time, insertion_time + transmitting_time]
 
                             for interval2 in time_span:
                                 if has_intersection(interval, interval2):
-                                    transmitting_node_list.append([transmitter, channel_used])
-
-                    # remove duplicates
-                    transmitting_node_list = [list(x) for x in {tuple(i) for i in transmitting_node_list}]
+                                    transmitting_nodes.add((transmitter, channel_used))
+                                    break
 
-                    sinr_list = sinr_calculator(self, all_drones_send_to_me, transmitting_node_list)
+                    sinr_list = sinr_calculator(self, all_drones_send_to_me, list(transmitting_nodes))
 
                     # receive the packet of the transmitting node corresponding to the maximum SINR
                     max_sinr = max(sinr_list)
@@ -399,18 +398,25 @@ class Drone:
         --------------------------------------------------------> time
         """
 
+        inbox = self.inbox
+        send_time = inbox.send_time  # the moment that each packet begins to be sent to the channel, in order
+        if not send_time:
+            return
+
         if config.VARIABLE_PAYLOAD_LENGTH:
             max_transmission_time = ((config.AVERAGE_PAYLOAD_LENGTH + config.MAXIMUM_PAYLOAD_VARIATION)
                                      / config.BIT_RATE) * 1e6  # for a single data packet
         else:
             max_transmission_time = (config.AVERAGE_PAYLOAD_LENGTH / config.BIT_RATE) * 1e6  # for a single data packet
 
-        for item in self.inbox:
-            insertion_time = item[1]  # the moment that this packet begins to be sent to the channel
-            received = item[3]  # used to indicate if this packet has been processed (1: processed, 0: unprocessed)
-            if insertion_time + 2 * max_transmission_time < self.env.now:  # no impact on the current packet
-                if received:
-                    self.inbox.remove(item)
+        # a packet sent before the deadline has no impact on the current packet, they are all at the front
+        deadline = self.env.now - 2 * max_transmission_time
+        if send_time[0] >= deadline:
+            return
+
+        old = bisect_left(send_time, deadline)
+        if any(inbox.processed[:old]):  # processed flag of each packet (1: processed, 0: unprocessed)
+            inbox.discard_processed(old)
 
     def trigger(self):
         """
@@ -429,12 +435,18 @@ class Drone:
         time_span = []
         potential_packet = []
 
-        for item in self.inbox:
-            packet = item[0]  # not sure yet whether it has been completely transmitted
-            insertion_time = item[1]  # transmission start time
-            transmitter = item[2]
-            processed = item[3]  # indicate if this packet has been processed
-            channel_used = item[4]  # indicate the sub-channel that used to transmit this packet
+        inbox = self.inbox
+        if not inbox.pending:  # every packet in the inbox has already been processed
+            return flag, all_drones_send_to_me, time_span, potential_packet
+
+        processed_flags = inbox.processed  # indicate if each packet has been processed
+
+        for i in range(len(processed_flags)):
+            packet = inbox.packet[i]  # not sure yet whether it has been completely transmitted
+            insertion_time = inbox.send_time[i]  # transmission start time
+            transmitter = inbox.src[i]
+            processed = processed_flags[i]
+            channel_used = inbox.channel[i]  # indicate the sub-channel that used to transmit this packet
 
             transmitting_time = packet.packet_length / config.BIT_RATE * 1e6  # expected transmission time
 
@@ -444,7 +456,8 @@ class Drone:
                     all_drones_send_to_me.append([transmitter, channel_used])
                     time_span.append([insertion_time, insertion_time + transmitting_time])
                     potential_packet.append(packet)
-                    item[3] = 1
+                    processed_flags[i] = 1
+                    inbox.pending -= 1
                 else:
                     pass
             else:
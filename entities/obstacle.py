@@ -1,23 +1,143 @@
-from utils.util_function import euclidean_distance_3d
+import numpy as np
 from utils import config
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional, SphereField falls back to numpy broadcasting
+    njit = None
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _any_hit(centers, radii_sq, pts, out):
+        """For each point, stop at the first sphere that contains it"""
+        for i in prange(pts.shape[0]):
+            hit = False
+            px, py, pz = pts[i, 0], pts[i, 1], pts[i, 2]
+            for j in range(centers.shape[0]):
+                dx = px - centers[j, 0]
+                dy = py - centers[j, 1]
+                dz = pz - centers[j, 2]
+                if dx * dx + dy * dy + dz * dz <= radii_sq[j]:
+                    hit = True
+                    break
+            out[i] = hit
+else:
+    _any_hit = None
+
 class SphericalObstacle:
     def __init__(self, center, radius, obstacle_id=1):
         self.center = center  # in meter
         self.radius = radius  # in meter
         self.id = obstacle_id
 
+        # squared distances are compared so that no sqrt is needed
+        self._center_arr = np.asarray(center, dtype=float)
+        self._r2 = radius * radius
+
+    def is_colliding(self, point):
+        """Check if a single point lies inside the sphere"""
+        dx = point[0] - self.center[0]
+        dy = point[1] - self.center[1]
+        dz = point[2] - self.center[2]
+        return dx * dx + dy * dy + dz * dz <= self._r2
+
+    def is_colliding_batch(self, points):
+        """
+        Check a batch of points against the sphere
+        :param points: array of shape (N, 3)
+        :return: boolean array of shape (N,)
+        """
+
+        d = np.asarray(points, dtype=float) - self._center_arr
+        return np.einsum('ij,ij->i', d, d) <= self._r2
+
     def add_to_grid(self, grid):
         x0, y0, z0 = self.center
         x0, y0, z0 = int(round(x0)), int(round(y0)), int(round(z0))
 
-        for x in range(max(0, x0 - self.radius), min(config.MAP_LENGTH, x0 + self.radius)):
-            for y in range(max(0, y0 - self.radius), min(config.MAP_WIDTH, y0 + self.radius)):
-                for z in range(max(0, z0 - self.radius), min(config.MAP_HEIGHT, z0 + self.radius)):
-                    if euclidean_distance_3d([x, y, z], self.center) <= self.radius:
-                        grid[int(x / config.GRID_RESOLUTION),
-                             int(y / config.GRID_RESOLUTION),
-                             int(z / config.GRID_RESOLUTION)] = self.id
+        xs = np.arange(max(0, x0 - self.radius), min(config.MAP_LENGTH, x0 + self.radius))
+        ys = np.arange(max(0, y0 - self.radius), min(config.MAP_WIDTH, y0 + self.radius))
+        zs = np.arange(max(0, z0 - self.radius), min(config.MAP_HEIGHT, z0 + self.radius))
+
+        points = np.stack(np.meshgrid(xs, ys, zs, indexing='ij'), axis=-1).reshape(-1, 3)
+        inside = points[self.is_colliding_batch(points)]
+
+        cells = (inside / config.GRID_RESOLUTION).astype(int)
+        grid[cells[:, 0], cells[:, 1], cells[:, 2]] = self.id
+
+
+class SphereField:
+    """
+    All spherical obstacles of the map stored as one structure of arrays
+
+    Attributes:
+        centers: (M, 3) array with the center of each sphere, in meter
+        radii_sq: (M,) array with the squared radius of each sphere
+        size: number of spheres currently stored
+    """
+
+    def __init__(self, capacity=16):
+        self._centers = np.empty((capacity, 3), dtype=float)
+        self._radii_sq = np.empty(capacity, dtype=float)
+        self.size = 0
+
+    @property
+    def centers(self):
+        return self._centers[:self.size]
+
+    @property
+    def radii_sq(self):
+        return self._radii_sq[:self.size]
+
+    def add(self, center, radius):
+        if self.size == len(self._radii_sq):
+            # double the storage when it is full
+            capacity = max(1, 2 * self.size)
+            self._centers = np.resize(self._centers, (capacity, 3))
+            self._radii_sq = np.resize(self._radii_sq, capacity)
+
+        self._centers[self.size] = center
+        self._radii_sq[self.size] = radius * radius
+        self.size += 1
+
+    def add_obstacle(self, obstacle):
+        self.add(obstacle.center, obstacle.radius)
+
+    def collisions(self, points):
+        """
+        Pairwise collision matrix
+        :param points: array of shape (N, 3)
+        :return: boolean array of shape (N, M), True if point i is inside sphere j
+        """
+
+        points = np.asarray(points, dtype=float)
+        diff = points[:, None, :] - self.centers[None, :, :]
+        d2 = np.einsum('ijk,ijk->ij', diff, diff)
+        return d2 <= self.radii_sq
+
+    def any_collision(self, points, chunk_size=4096):
+        """
+        Check if each point collides with at least one sphere
+        :param points: array of shape (N, 3)
+        :param chunk_size: number of points evaluated at once, bounds the (chunk, M) temporary (numpy path only)
+        :return: boolean array of shape (N,)
+        """
+
+        points = np.ascontiguousarray(points, dtype=float)
+        hit = np.zeros(len(points), dtype=bool)
+
+        if self.size == 0:
+            return hit
+
+        if _any_hit is not None:
+            _any_hit(self.centers, self.radii_sq, points, hit)
+            return hit
+
+        for start in range(0, len(points), chunk_size):
+            hit[start:start + chunk_size] = self.collisions(points[start:start + chunk_size]).any(axis=1)
+
+        return hit
 
 
 class CubeObstacle:
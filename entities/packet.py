@@ -1,6 +1,21 @@
+from functools import lru_cache
 from utils import config
 
 
+@lru_cache(maxsize=None)
+def _slot_names(cls):
+    """Attribute names of the slots declared along the MRO of a packet class, private names mangled"""
+
+    names = []
+    for klass in cls.__mro__:
+        for slot in klass.__dict__.get('__slots__', ()):
+            if slot.startswith('__') and not slot.endswith('__'):
+                slot = '_' + klass.__name__.lstrip('_') + slot
+            if slot != '__dict__':
+                names.append(slot)
+    return tuple(names)
+
+
 class Packet:
     """
     Basic properties of the packet
@@ -26,6 +41,12 @@ class Packet:
     Updated at: 2025/3/30
     """
 
+    # the base fields live in slots; subclasses that declare no __slots__ still get a __dict__ for their own fields
+    __slots__ = ('packet_id', 'packet_length', 'creation_time', 'deadline', 'simulator', 'channel_id', '__ttl',
+                 'number_retransmission_attempt', 'waiting_start_time', 'first_attempt_time',
+                 'transmitting_start_time', 'time_delivery', 'time_transmitted_at_last_hop', 'transmission_mode',
+                 'intermediate_drones')
+
     def __init__(self,
                  packet_id,
                  packet_length,
@@ -57,6 +78,50 @@ class Packet:
 
         self.intermediate_drones = []
 
+    def clone_for_forward(self):
+        """
+        Shallow copy of the packet for the next hop, same result as "copy.copy" without its generic dispatch. The
+        copy gets its own scalar fields (next hop, TTL, timestamps), so the sender's copy that may still be
+        retransmitted is left untouched
+        """
+
+        cls = type(self)
+        clone = object.__new__(cls)
+        for name in _slot_names(cls):
+            try:
+                object.__setattr__(clone, name, object.__getattribute__(self, name))
+            except AttributeError:  # slot that has never been set
+                pass
+        state = getattr(self, '__dict__', None)
+        if state:
+            clone.__dict__.update(state)
+        return clone
+
+    def renew(self, packet_id, creation_time, channel_id):
+        """
+        New packet of the same class that uses this one as a template, "__init__" is not run again. The constant
+        fields (length, deadline, simulator, transmission mode) are taken over and the per-transmission state starts
+        over as in a new packet. Subclasses set their own fields on the result
+        """
+
+        fresh = object.__new__(type(self))
+        fresh.packet_id = packet_id
+        fresh.packet_length = self.packet_length
+        fresh.creation_time = creation_time
+        fresh.deadline = self.deadline
+        fresh.simulator = self.simulator
+        fresh.channel_id = channel_id
+        fresh.__ttl = 0
+        fresh.number_retransmission_attempt = dict.fromkeys(self.number_retransmission_attempt, 0)
+        fresh.waiting_start_time = None
+        fresh.first_attempt_time = None
+        fresh.transmitting_start_time = None
+        fresh.time_delivery = None
+        fresh.time_transmitted_at_last_hop = 0
+        fresh.transmission_mode = self.transmission_mode
+        fresh.intermediate_drones = []
+        return fresh
+
     def increase_ttl(self):
         self.__ttl += 1
 
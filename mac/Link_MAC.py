@@ -1,21 +1,53 @@
+import heapq
+import math
 import random
+import struct
 import time
+import zlib
 from collections import deque
 from dataclasses import dataclass, field
-from enum import Enum
-from typing import Optional, List, Tuple, Dict, Callable
+from functools import lru_cache
+from enum import IntEnum
+from typing import Optional, List, Tuple, Dict, Callable, Iterator
 
 
-class FrameType(Enum):
+class FrameType(IntEnum):
     DATA = 1
     ACK = 2
     BEACON = 3
 
-class DroneRole(Enum):
+class DroneRole(IntEnum):
     COMMAND_CONTROL = 1
     WORKER_DRONE = 2
 
-@dataclass
+# Plain int aliases for the comparisons on the hot paths, avoids the enum attribute lookup
+_DATA = FrameType.DATA.value
+_ACK = FrameType.ACK.value
+_BEACON = FrameType.BEACON.value
+_CNC = DroneRole.COMMAND_CONTROL.value
+
+# Wire header: frame type, source hash, destination hash (0 = broadcast), sequence number, retry count, timestamp
+_FRAME_HDR = struct.Struct("!BIIIBd")
+
+
+def _clock(env) -> Callable[[], float]:
+    """
+    Clock used by the MAC components, in seconds.
+    Simulation time when a simpy env is given (simpy time is in microseconds), the monotonic clock otherwise
+    (timestamps are only compared with each other, never with calendar time).
+    """
+    if env is None:
+        return time.monotonic
+    return lambda: env.now / 1e6
+
+
+@lru_cache(maxsize=1024)
+def _hash32(node_id) -> int:
+    """Stable 32-bit hash of a node identifier, used in the frame header."""
+    return zlib.crc32(str(node_id).encode('utf-8'))
+
+
+@dataclass(slots=True)
 class MACFrame:
     """MAC frame structure used in transmissions"""
     frame_type: FrameType
@@ -23,16 +55,101 @@ class MACFrame:
     dest: Optional[str]              # NONE if sending a broadcast
     seq_num: int
     payload: bytes
-    timestamp: float = field(default_factory=time.time)
+    timestamp: float = field(default_factory=time.monotonic)
     retry_count: int = 0
 
-@dataclass
+    def reset(self, frame_type: FrameType, source: str, dest: Optional[str], seq_num: int, payload: bytes,
+              timestamp: float):
+        """Reinitialize a recycled frame in place, as if it was freshly constructed."""
+        self.frame_type = frame_type
+        self.source = source
+        self.dest = dest
+        self.seq_num = seq_num
+        self.payload = payload
+        self.timestamp = timestamp
+        self.retry_count = 0
+
+    def encode_into(self, buf: bytearray, offset: int = 0) -> int:
+        """
+        Serialize the frame into a preallocated buffer, no intermediate bytes object is created.
+
+        Args:
+            buf: Writable buffer, must hold the header plus the payload.
+            offset: Position in buf where the frame starts.
+
+        Returns:
+            Number of bytes written.
+
+        Raises:
+            ValueError: If buf is too small, nothing is written then.
+        """
+        start = offset + _FRAME_HDR.size
+        end = start + len(self.payload)
+        # Checked upfront, a slice assignment past the end would silently grow a bytearray
+        if offset < 0 or len(buf) < end:
+            raise ValueError(f"Buffer of {len(buf)} bytes cannot hold a {end - offset} bytes frame at offset {offset}")
+        dest_hash = 0 if self.dest is None else _hash32(self.dest)
+        _FRAME_HDR.pack_into(buf, offset, self.frame_type, _hash32(self.source), dest_hash,
+                             self.seq_num, self.retry_count, self.timestamp)
+        buf[start:end] = self.payload
+        return end - offset
+
+@dataclass(slots=True)
 class Neighbor:
     node_id: str
     role: DroneRole
     last_seen: float
     signal_strength: float = 1.0
     position: Optional[Tuple[float, float, float]] = None
+    deadline: float = 0.0            # last_seen + expiry timeout, the neighbor expires once this time is reached
+    version: int = 0                 # Bumped on every update, used to ignore stale expiry entries
+
+# ---------------------------------------------------------------------------------------------------------------------
+# FRAME POOL
+# ---------------------------------------------------------------------------------------------------------------------
+class MACFramePool:
+    """
+    Free-list of MACFrame objects, avoids allocating a new frame for every transmission.
+    Only frames that never reached the channel may be released: the channel keeps a reference
+    to every frame it delivers.
+    """
+
+    def __init__(self, size: int = 0, max_size: Optional[int] = None):
+        """
+        Initializes the pool.
+
+        Args:
+            size: Number of frames allocated upfront. The pool grows when it runs out.
+            max_size: Maximum number of idle frames kept, released frames beyond it are left to the GC.
+                      Unbounded when not given.
+        """
+        self._free: List[MACFrame] = [MACFrame(FrameType.DATA, "", None, 0, b"") for _ in range(size)]
+        self.max_size = max_size
+
+    def acquire(self, frame_type: FrameType, source: str, dest: Optional[str], seq_num: int,
+                payload: bytes, timestamp: float) -> MACFrame:
+        """
+        Get a frame from the pool, or a new one if the pool is empty.
+        """
+        if not self._free:
+            return MACFrame(frame_type, source, dest, seq_num, payload, timestamp)
+
+        frame = self._free.pop()
+        frame.reset(frame_type, source, dest, seq_num, payload, timestamp)
+        return frame
+
+    def release(self, frame: MACFrame):
+        """
+        Return a frame to the pool.
+        """
+        if self.max_size is not None and len(self._free) >= self.max_size:
+            return
+        frame.payload = b""             # Do not keep the payload alive while the frame is idle
+        self._free.append(frame)
+
+    def available(self) -> int:
+        return len(self._free)
+
 
 # ---------------------------------------------------------------------------------------------------------------------
 # QUEUE MANAGEMENT
@@ -41,17 +158,27 @@ class MACQueue:
     """
     FIFO queue with limited capacity.
     When the queue is full, it drops the oldest frame automatically.
+
+    Frames are stored in a preallocated ring buffer, slots are reused instead of allocating a node per frame.
+    The buffer length is rounded up to a power of two so that indices wrap with a mask.
     """
 
-    def __init__(self, max_capacity: int = 100):
+    def __init__(self, max_capacity: int = 100, frame_pool: Optional[MACFramePool] = None):
         """
         Initializes the queue.
 
         Args:
             max_capacity: Maximum number of frames the queue can hold.
+            frame_pool: Pool that receives the dropped frames which were never transmitted.
         """
-        self.transmissions_queue = deque(maxlen=max_capacity)
+        buffer_size = 1 << max(max_capacity - 1, 0).bit_length()
+        self.buffer: List[Optional[MACFrame]] = [None] * buffer_size
+        self.mask = buffer_size - 1
+        self.head = 0                   # Index of the oldest frame
+        self.tail = 0                   # Index of the next free slot
+        self.count = 0
         self.max_capacity = max_capacity
+        self.frame_pool = frame_pool
         self.total_enqueued = 0
         self.total_dropped = 0
 
@@ -63,16 +190,79 @@ class MACQueue:
             True if added without dropping.
             False if an old frame was dropped.
         """
-        full = len(self.transmissions_queue) >= self.max_capacity
-
-        self.transmissions_queue.append(frame)
         self.total_enqueued += 1
+        if self.max_capacity == 0:
+            return self._drop_incoming(frame)
+
+        buffer = self.buffer
+        mask = self.mask
+        head = self.head
+        dropped = self.count == self.max_capacity
+
+        if dropped:
+            # Release the oldest frame, its slot is reclaimed by moving the head forward below
+            oldest = buffer[head]
+            buffer[head] = None
+            # A frame without retries has not been put on the channel yet, nothing else references it
+            if self.frame_pool is not None and oldest.retry_count == 0:
+                self.frame_pool.release(oldest)
+
+        # Bools are used as ints: a drop moves the head and counts a drop, otherwise the queue grows
+        self.head = (head + dropped) & mask
+        self.total_dropped += dropped
+        self.count += not dropped
+
+        tail = self.tail
+        buffer[tail] = frame
+        self.tail = (tail + 1) & mask
+
+        return not dropped
+
+    def push_front(self, frame: MACFrame) -> bool:
+        """
+        Put a frame at the head of the queue, it is the next one dequeued. Used for retransmissions,
+        which go out before the frames queued after them. If full, the newest frame is dropped.
 
-        if full:
-            self.total_dropped += 1
-            return False
+        Returns:
+            True if added without dropping.
+            False if the newest frame was dropped.
+        """
+        if self.max_capacity == 0:
+            return self._drop_incoming(frame)
 
-        return True
+        buffer = self.buffer
+        mask = self.mask
+        dropped = self.count == self.max_capacity
+
+        if dropped:
+            # Drop the newest frame, its slot is reclaimed by moving the tail back
+            tail = (self.tail - 1) & mask
+            newest = buffer[tail]
+            buffer[tail] = None
+            self.tail = tail
+            if self.frame_pool is not None and newest.retry_count == 0:
+                self.frame_pool.release(newest)
+
+        self.total_dropped += dropped
+        self.count += not dropped
+
+        head = (self.head - 1) & mask
+        buffer[head] = frame
+        self.head = head
+
+        return not dropped
+
+    def _drop_incoming(self, frame: MACFrame) -> bool:
+        """
+        A queue without capacity holds nothing, the incoming frame itself is the dropped one.
+
+        Returns:
+            False, the frame was dropped.
+        """
+        self.total_dropped += 1
+        if self.frame_pool is not None and frame.retry_count == 0:
+            self.frame_pool.release(frame)
+        return False
 
     def dequeue(self) -> Optional[MACFrame]:
         """
@@ -81,16 +271,22 @@ class MACQueue:
         Returns:
             Frame if available, None is empty.
         """
-        if len(self.transmissions_queue) == 0:
+        if self.count == 0:
             return None
 
-        return self.transmissions_queue.popleft()
+        buffer = self.buffer
+        head = self.head
+        frame = buffer[head]
+        buffer[head] = None                 # Release the reference held by the slot
+        self.head = (head + 1) & self.mask
+        self.count -= 1
+        return frame
 
     def size(self):
-        return len(self.transmissions_queue)
+        return self.count
 
     def is_empty(self) -> bool:
-        return len(self.transmissions_queue) == 0
+        return self.count == 0
 
     def get_drop_count(self) -> int:
         return self.total_dropped
@@ -104,19 +300,29 @@ class NeighborTable:
     C&C drone keeps track of all worker drones.
     Worker drone only tracks C&C drone.
     """
-    def __init__(self, expiry_timeout: float = 10.0):
+    def __init__(self, expiry_timeout: float = 10.0, env=None):
         """
         Initialized neighbor table.
 
         Args:
             expiry_timeout: Seconds before the neighbor is dropped from the table.
+            env: Simpy environment, timestamps follow its clock. The monotonic clock is used without it.
         """
+        self._now = _clock(env)
         self.neighbor_table = {}
         self.expiry_timeout = expiry_timeout
         self.cnd_drone_id = None
+        # (deadline, node_id, version) in the order the updates happened. The timeout is the same for
+        # every neighbor and the clock only moves forward, so deadlines are sorted and the oldest is on
+        # the left. Entries are never removed on update, instead an entry is ignored when its version
+        # no longer matches the neighbor.
+        self._expiry_queue: deque = deque()
+        # Last list returned by get_active(), None when the set of neighbors changed since
+        self._active_cache: Optional[List[Neighbor]] = None
 
     def add_or_update(self, node_id: str, role: DroneRole, signal_strength: float = 1.0,
-                      position: Optional[Tuple[float, float, float]] = None):
+                      position: Optional[Tuple[float, float, float]] = None,
+                      current_time: Optional[float] = None):
         """
         Add new neighbor or update existing one.
 
@@ -125,11 +331,13 @@ class NeighborTable:
             role: C&C or WORKER
             signal_strength: default 1.0
             position: Current position of the drone
+            current_time: Timestamp of this MAC tick, read from the clock if not given
         """
-        current_time = time.time()
+        if current_time is None:
+            current_time = self._now()
 
         # Tracks if it is the C&C drone.
-        if role == DroneRole.COMMAND_CONTROL:
+        if role == _CNC:
             self.cnd_drone_id = node_id
 
         # Check if neighbor already exists in the table
@@ -138,62 +346,127 @@ class NeighborTable:
             neighbor = self.neighbor_table[node_id]
             neighbor.last_seen = current_time        # Update timestamp
             neighbor.signal_strength = signal_strength
+            neighbor.version += 1
             if position:
                 neighbor.position = position
         else:
             # New neighbor, add it
-            self.neighbor_table[node_id] = Neighbor(
+            neighbor = Neighbor(
                 node_id = node_id,
                 role = role,
                 last_seen = current_time,
                 signal_strength = signal_strength,
                 position = position
             )
+            self.neighbor_table[node_id] = neighbor
+            self._active_cache = None
+
+        neighbor.deadline = current_time + self.expiry_timeout
+        self._expiry_queue.append((neighbor.deadline, node_id, neighbor.version))
 
     def get_cnd_drone(self) -> Optional[Neighbor]:
         """
         Get the C&C drone information, will be used by workers to find their hub
         """
-        if self.cnd_drone_id and self.cnd_drone_id in self.neighbor_table:
-            return self.neighbor_table[self.cnd_drone_id]
-        return None
+        # Single lookup, the id is None until a C&C beacon was seen
+        return self.neighbor_table.get(self.cnd_drone_id)
 
-    def get_active(self) -> List[Neighbor]:
+    def get_active(self, current_time: Optional[float] = None) -> List[Neighbor]:
         """
         Get all neighbors that have not expired.
 
+        Args:
+            current_time: Timestamp of this MAC tick, read from the clock if not given
+
         Returns:
-            List of Neighbor objects that are still active.
+            List of Neighbor objects that are still active. The list is cached and shared between
+            calls, it must not be modified.
+        """
+        if current_time is None:
+            current_time = self._now()
+
+        # The cached list stays exact until a new neighbor joins or the earliest deadline is reached
+        expiry_queue = self._expiry_queue
+        if self._active_cache is not None and (not expiry_queue or current_time < expiry_queue[0][0]):
+            return self._active_cache
+
+        self._active_cache = list(self.iter_active(current_time))
+        return self._active_cache
+
+    def iter_active(self, current_time: Optional[float] = None) -> Iterator[Neighbor]:
+        """
+        Iterate over the neighbors that have not expired, without building a list.
+
+        Args:
+            current_time: Timestamp of this MAC tick, read from the clock if not given
+
+        Returns:
+            Iterator over the active Neighbor objects.
+        """
+        self.remove_expired(current_time)
+        return iter(self.neighbor_table.values())
+
+    def count_active(self, current_time: Optional[float] = None) -> int:
+        """
+        Number of neighbors that have not expired.
+
+        Args:
+            current_time: Timestamp of this MAC tick, read from the clock if not given
         """
-        current_time = time.time()
-        active_neighbors = []
+        self.remove_expired(current_time)
+        return len(self.neighbor_table)
 
-        for neighbor in self.neighbor_table.values():
-            time_last_seen = current_time - neighbor.last_seen
-            if time_last_seen < self.expiry_timeout:
-                active_neighbors.append(neighbor)
+    def is_active(self, node_id: str, current_time: Optional[float] = None) -> bool:
+        """
+        Check if a given neighbor is in the table and has not expired.
 
-        return active_neighbors
+        Args:
+            node_id: Unique identifier
+            current_time: Timestamp of this MAC tick, read from the clock if not given
+        """
+        if current_time is None:
+            current_time = self._now()
+        neighbor = self.neighbor_table.get(node_id)
+        return neighbor is not None and neighbor.deadline > current_time
 
-    def remove_expired(self) -> int:
+    def remove_expired(self, current_time: Optional[float] = None) -> int:
         """
         Remove the expired neighbors from the list.
+        Only the expiry entries that are actually due are visited.
+
+        Args:
+            current_time: Timestamp of this MAC tick, read from the clock if not given
 
         Returns:
             Number of remove neighbors.
         """
-        current_time = time.time()
-        expired_neighbors = []
-
-        for node_id, neighbor in self.neighbor_table.items():
-            time_last_seen = current_time - neighbor.last_seen
-            if time_last_seen >= self.expiry_timeout:
-                expired_neighbors.append(node_id)
+        if current_time is None:
+            current_time = self._now()
+        expiry_queue = self._expiry_queue
+        table = self.neighbor_table
+        expired = []
+
+        while expiry_queue and expiry_queue[0][0] <= current_time:
+            _, node_id, version = expiry_queue.popleft()
+            neighbor = table.get(node_id)
+
+            # Skip stale entries, the neighbor was removed or updated after this entry was pushed
+            if neighbor is not None and neighbor.version == version:
+                expired.append(node_id)
+
+        if len(table) > 32 and len(expired) * 4 > len(table):
+            # Many neighbors left at once, rebuilding is cheaper than deleting one by one
+            # and does not leave deleted slots behind in the dict
+            expired_ids = set(expired)
+            self.neighbor_table = {k: v for k, v in table.items() if k not in expired_ids}
+        else:
+            for node_id in expired:
+                del table[node_id]
 
-        for node_id in expired_neighbors:
-            del self.neighbor_table[node_id]
+        if expired:
+            self._active_cache = None
 
-        return len(expired_neighbors)
+        return len(expired)
 
     def get_signal_strength_to_cnd(self) -> float:
         """
@@ -218,7 +491,8 @@ class CSMACA:
     """
     Implements the Carrier Sense Multiple Access with Collision Avoidance CSMA/CA protocol.
     """
-    def __init__(self, channel, my_drone, min_backoff: float = 0.01, max_backoff: float = 0.1):
+    def __init__(self, channel, my_drone, min_backoff: float = 0.01, max_backoff: float = 0.1,
+                 seed: Optional[int] = None):
         """
         Initialize CSMA/CA controller
 
@@ -227,16 +501,32 @@ class CSMACA:
             my_drone: Reference to drone object
             min_backoff: Minimum backoff time in seconds.
             max_backoff: Maximum backoff time in seconds.
+            seed: Seed of the backoff random generator, seeded from the OS when not given.
         """
         self.channel = channel
         self.my_drone = my_drone
+        self.env = my_drone.env
+        # Own generator per controller, the module-level one is shared by every drone
+        self.rng_mac = random.Random(seed)
         self.min_backoff = min_backoff
         self.max_backoff = max_backoff
         self.current_backoff = min_backoff                  # Starts at minimum
 
-    def transmit_with_csma(self, frame: MACFrame) -> bool:
+        # Binary exponential backoff ladder: min_backoff * 2^i, saturated at max_backoff
+        ladder_length = math.ceil(math.log2(max_backoff / min_backoff)) + 1 if max_backoff > min_backoff else 1
+        self._ladder = tuple(min(min_backoff * (2 ** i), max_backoff) for i in range(ladder_length))
+        self._attempt = 0
+
+        # When every window is a power of two in microseconds, the backoff is drawn as an integer
+        # number of microseconds with getrandbits(), i.e. a random word masked with (window - 1)
+        ladder_us = [round(backoff * 1e6) for backoff in self._ladder]
+        self._pow2_windows = all(w > 0 and w & (w - 1) == 0 for w in ladder_us)
+        self._ladder_bits = tuple(w.bit_length() - 1 for w in ladder_us)
+
+    def transmit_with_csma(self, frame: MACFrame):
         """
-        Attempt to transmit a frame using CSMA/CA
+        Attempt to transmit a frame using CSMA/CA.
+        This is a simpy process: the backoff is waited in simulation time, not wall-clock time.
 
         Args:
             frame: The MAC Frame to be transmitted
@@ -251,11 +541,15 @@ class CSMACA:
             return False
 
         # Calculate random backoff time to prevent multiple drones from transmitting simultaneously
-        backoff_time = random.uniform(0, self.current_backoff)
+        # Simulation time is in microseconds
+        if self._pow2_windows:
+            backoff_us = self.rng_mac.getrandbits(self._ladder_bits[self._attempt])
+        else:
+            backoff_us = self.rng_mac.random() * self.current_backoff * 1e6
 
         # Wait the backoff time, gives other drones an opportunity to access the channel
         # Spreads out transmissions to avoid collisions
-        time.sleep(backoff_time)
+        yield self.env.timeout(backoff_us)
 
         # Final carrier sense, double-check the channel is available
         if self._is_channel_busy():
@@ -290,13 +584,15 @@ class CSMACA:
         Returns:
             Float with the new backoff time.
         """
-        # Double current backoff, do not exceed the maximum
-        self.current_backoff = min(self.current_backoff * 2, self.max_backoff)
+        # Move one step up the ladder, the last step is the maximum
+        self._attempt = min(self._attempt + 1, len(self._ladder) - 1)
+        self.current_backoff = self._ladder[self._attempt]
 
     def reset_backoff(self):
         """
         Reset backoff window after a successful transmission.
         """
+        self._attempt = 0
         self.current_backoff = self.min_backoff
 
 
@@ -307,7 +603,9 @@ class AckRetry:
     """
     Handles the ACKs and retransmissions.
     """
-    def __init__(self, mac_queue: MACQueue, csma_controller: CSMACA, channel, my_drone, max_retries: int = 3, ack_timeout: float = 0.05):
+    def __init__(self, mac_queue: MACQueue, csma_controller: CSMACA, channel, my_drone, max_retries: int = 3,
+                 ack_timeout: float = 0.05, env=None, frame_pool: Optional[MACFramePool] = None,
+                 metrics: Optional["Metrics"] = None):
         """
         Initializes ACK/Retry handler.
 
@@ -318,7 +616,13 @@ class AckRetry:
             my_drone: Reference to drone object.
             max_retries: Maximum number of times to retry a frame.
             ack_timeout: Time to wait for an ACK before considering it a failure.
+            env: Simpy environment, timestamps follow its clock. The monotonic clock is used without it.
+            frame_pool: Pool the ACK frames are taken from, a private one is used when not given.
+            metrics: Metrics that record the frames dropped after max retries, not recorded when not given.
         """
+        self._now = _clock(env)
+        self.frame_pool = frame_pool if frame_pool is not None else MACFramePool()
+        self.metrics = metrics
         self.mac_queue = mac_queue
         self.csma_controller = csma_controller
         self.channel = channel
@@ -327,6 +631,9 @@ class AckRetry:
         self.ack_timeout = ack_timeout
         # Stores frames waiting for an ACK: { (dest, seq_num): MACFrame }
         self.pending_acks: Dict[Tuple[str, int], MACFrame] = {}
+        # Min-heap of (sent_time, key). Entries of ACKed or re-sent frames are left in place
+        # and skipped when popped, their sent time no longer matches the pending frame.
+        self._expiry_heap: List[Tuple[float, Tuple[str, int]]] = []
 
     def is_awaiting_ack(self, frame: MACFrame) -> bool:
         """Check if an ACK is expected for a given frame."""
@@ -337,7 +644,9 @@ class AckRetry:
     def register_sent_frame(self, frame: MACFrame):
         """Register a frame as sent and awaiting ACK."""
         if frame.dest: # Only track frames sent to a specific destination
-            self.pending_acks[(frame.dest, frame.seq_num)] = frame
+            key = (frame.dest, frame.seq_num)
+            self.pending_acks[key] = frame
+            heapq.heappush(self._expiry_heap, (frame.timestamp, key))
 
     def process_ack(self, ack_frame: MACFrame) -> bool:
         """
@@ -349,14 +658,14 @@ class AckRetry:
         Returns:
             True if the ACK matched a pending frame and was successfully processed.
         """
-        if ack_frame.frame_type != FrameType.ACK:
+        if ack_frame.frame_type != _ACK:
             return False
 
         # The ACK is for a frame *sent* by the ACK receiver, so the ACK's source is the original frame's destination
         key = (ack_frame.source, ack_frame.seq_num) 
         
-        if key in self.pending_acks:
-            del self.pending_acks[key]
+        # Single lookup, pending frames are never None
+        if self.pending_acks.pop(key, None) is not None:
             self.csma_controller.reset_backoff() # Successful transmission, reset backoff
             # print(f"[ACK] Received ACK from {ack_frame.source} for seq {ack_frame.seq_num}. Transmission complete.")
             return True
@@ -367,33 +676,40 @@ class AckRetry:
         """
         Check for pending ACKs that have timed out and handle retransmission/dropping.
         """
-        current_time = time.time()
+        current_time = self._now()
         frames_to_retry: List[MACFrame] = []
-        keys_to_remove: List[Tuple[str, int]] = []
-
-        for key, frame in self.pending_acks.items():
-            if current_time - frame.timestamp > self.ack_timeout:
-                keys_to_remove.append(key)
-                
-                if frame.retry_count < self.max_retries:
-                    frame.retry_count += 1
-                    frame.timestamp = time.time() # Update timestamp for next timeout check
-                    frames_to_retry.append(frame)
-                    self.csma_controller.increase_backoff() # Increase backoff on failed attempt
-                    # print(f"[RETRY] ACK timeout for {key}. Retrying (Attempt {frame.retry_count}).")
-                else:
-                    # print(f"[DROP] Frame {key} dropped after {self.max_retries} retries.")
-                    # In a real system, you would update metrics for dropped frames here
-                    pass
-
-        # Remove timed-out frames from pending list
-        for key in keys_to_remove:
-            if key in self.pending_acks:
-                del self.pending_acks[key]
-
-        # Enqueue frames for retry
-        for frame in frames_to_retry:
-            self.mac_queue.enqueue(frame)
+        pending_acks = self.pending_acks
+        expiry_heap = self._expiry_heap
+        # Frames sent before this time have timed out, computed once instead of per frame
+        cutoff = current_time - self.ack_timeout
+
+        # Only the frames whose deadline has passed are visited
+        while expiry_heap and expiry_heap[0][0] < cutoff:
+            sent_time, key = heapq.heappop(expiry_heap)
+            frame = pending_acks.get(key)
+
+            # Stale entry: the frame was ACKed, or was re-sent after this entry was pushed
+            if frame is None or frame.timestamp != sent_time:
+                continue
+
+            # Remove the timed-out frame from the pending list, the lookup above guarantees it is there
+            del pending_acks[key]
+
+            if frame.retry_count < self.max_retries:
+                frame.retry_count += 1
+                frame.timestamp = current_time # Update timestamp for next timeout check
+                frames_to_retry.append(frame)
+                self.csma_controller.increase_backoff() # Increase backoff on failed attempt
+                # print(f"[RETRY] ACK timeout for {key}. Retrying (Attempt {frame.retry_count}).")
+            elif self.metrics is not None:
+                # print(f"[DROP] Frame {key} dropped after {self.max_retries} retries.")
+                self.metrics.record_tx_failure(frame.retry_count)
+
+        # Retries go to the head of the queue, ahead of the new frames. Pushed newest first
+        # so that the oldest timed-out frame is the next one sent.
+        push_front = self.mac_queue.push_front
+        for frame in reversed(frames_to_retry):
+            push_front(frame)
 
     def create_ack_frame(self, original_frame: MACFrame, node_id: str) -> MACFrame:
         """
@@ -403,12 +719,13 @@ class AckRetry:
             original_frame: The frame being acknowledged.
             node_id: The ID of the drone creating the ACK.
         """
-        return MACFrame(
+        return self.frame_pool.acquire(
             frame_type=FrameType.ACK,
             source=node_id,
             dest=original_frame.source,
             seq_num=original_frame.seq_num,
-            payload=b'' # ACK frames typically have no payload
+            payload=b'', # ACK frames typically have no payload
+            timestamp=self._now()
         )
 
 # ---------------------------------------------------------------------------------------------------------------------
@@ -418,8 +735,12 @@ class BeaconManager:
     """
     Send periodic broadcast beacons to announce presence to ground stations and other drones in the network.
     """
+    _BEACON_FMT = struct.Struct("<Bfff")      # role, x, y, z
+    _BEACON_FMT_NOPOS = struct.Struct("<B")   # role only, position unknown
+
     def __init__(self, node_id: str, role: DroneRole, channel, beacon_interval: float = 1.0,
-                 get_position_func: Callable[[], Optional[Tuple[float, float, float]]] = lambda: None):
+                 get_position_func: Callable[[], Optional[Tuple[float, float, float]]] = lambda: None,
+                 env=None):
         """
         Initialize Beacon Manager.
 
@@ -429,44 +750,69 @@ class BeaconManager:
             channel: PropChannel from prob_channel.py.
             beacon_interval: Time in seconds between beacon transmissions.
             get_position_func: A function to call to get the drone's current position.
+            env: Simpy environment, timestamps follow its clock. The monotonic clock is used without it.
         """
+        self._now = _clock(env)
         self.node_id = node_id
         self.role = role
         self.channel = channel
         self.beacon_interval = beacon_interval
-        self.last_beacon_time = 0.0
+        self.last_beacon_time = -beacon_interval        # The first beacon is due right away
         self.seq_num_counter = 0
         self.get_position = get_position_func
+        self._last_position = object()                  # Never equal to a position, the first beacon is encoded
+        self._last_payload = b""
 
-    def send_beacon(self):
+    def send_beacon(self, targets: Optional[List] = None):
         """
         Send beacon using ProbChannel.broadcast_put().
+
+        Args:
+            targets: If given, only these drones receive the beacon. The whole list is
+                     submitted to the channel in a single multicast_put() call.
         """
         beacon_frame = self.create_beacon_frame()
-        # Broadcast using channel.py
-        self.channel.broadcast_put(beacon_frame)
+        if targets is None:
+            # Broadcast using channel.py
+            self.channel.broadcast_put(beacon_frame)
+        else:
+            self.channel.multicast_put(beacon_frame, targets)
 
     def needs_to_send_beacon(self) -> bool:
         """Check if it's time to send a new beacon."""
-        return (time.time() - self.last_beacon_time) >= self.beacon_interval
+        return (self._now() - self.last_beacon_time) >= self.beacon_interval
 
     def create_beacon_frame(self) -> MACFrame:
         """
         Create a MACFrame for a beacon. The payload contains the drone's role and position.
         """
         self.seq_num_counter += 1
-        self.last_beacon_time = time.time()
+        self.last_beacon_time = self._now()
         
-        # Payload format: (role_value, position_tuple_or_None)
+        # Payload format: role byte, followed by three float32 coordinates when the position is known
+        # The bytes of the last beacon are reused as long as the position does not change
         position = self.get_position()
-        payload = f"{self.role.value},{position or ''}".encode('utf-8')
+        if position is not None:
+            position = tuple(position)          # Snapshot, coords may be a list that is changed in place
+            if len(position) != 3:
+                position = None                 # Not a 3D position, sent as unknown
+        if position == self._last_position:
+            payload = self._last_payload
+        else:
+            if position is None:
+                payload = self._BEACON_FMT_NOPOS.pack(self.role.value)
+            else:
+                payload = self._BEACON_FMT.pack(self.role.value, *position)
+            self._last_position = position
+            self._last_payload = payload
 
         return MACFrame(
             frame_type=FrameType.BEACON,
             source=self.node_id,
             dest=None, # Broadcast frame
             seq_num=self.seq_num_counter,
-            payload=payload
+            payload=payload,
+            timestamp=self.last_beacon_time
         )
 
     @staticmethod
@@ -478,24 +824,16 @@ class BeaconManager:
             A tuple of (DroneRole, Optional[PositionTuple]) or None on failure.
         """
         try:
-            parts = payload.decode('utf-8').split(',')
-            if not parts or len(parts) < 1:
-                return None
-            
-            role_value = int(parts[0])
-            role = DroneRole(role_value)
-            
-            position = None
-            if len(parts) >= 2 and parts[1]:
-                # Assuming position is encoded as comma-separated floats if available
-                pos_parts = parts[1].strip('() ').split(' ') # Simple split based on common tuple string
-                if len(pos_parts) == 3:
-                    position = (float(pos_parts[0]), float(pos_parts[1]), float(pos_parts[2]))
-            
-            return role, position
-        except Exception as e:
-            # print(f"Error parsing beacon payload: {e}")
-            return
+            if len(payload) >= BeaconManager._BEACON_FMT.size:
+                role_value, x, y, z = BeaconManager._BEACON_FMT.unpack_from(payload)
+                position = (x, y, z)
+            else:
+                role_value, = BeaconManager._BEACON_FMT_NOPOS.unpack_from(payload)
+                position = None
+            return DroneRole(role_value), position
+        except (struct.error, ValueError):
+            # Truncated payload or unknown role value
+            return None
 
 # ---------------------------------------------------------------------------------------------------------------------
 # MAIN MAC LAYER - INTEGRATES WITH CHANNEL.PY
@@ -524,18 +862,24 @@ class MACLayer:
         # Get channel simulator
         self.channel = my_drone.simulator.channel
         self.env = my_drone.env
+        self._now = _clock(self.env)
 
-        # Initialize MAC queue
-        self.queue = MACQueue(max_capacity=queue_capacity)
+        # Initialize frame pool and MAC queue, shared by the data and ACK paths
+        self.frame_pool = MACFramePool(size=queue_capacity, max_size=2 * queue_capacity)
+        self.queue = MACQueue(max_capacity=queue_capacity, frame_pool=self.frame_pool)
 
         # Initialize CSMA/CA with ProbChannel
         self.csma = CSMACA(
             channel=self.channel,
             my_drone=my_drone,
             min_backoff=0.01,
-            max_backoff=0.1
+            max_backoff=0.1,
+            seed=my_drone.identifier + my_drone.simulator.seed + 5
         )
 
+        # Initialize Metrics, shared with the ACK/Retry handler
+        self.metrics = Metrics(node_id=self.node_id, env=self.env)
+
         # Initialize ACK/Retry with ProbChannel
         self.ack_retry = AckRetry(
             mac_queue=self.queue,
@@ -543,7 +887,10 @@ class MACLayer:
             channel=self.channel,
             my_drone=my_drone,
             max_retries=3,
-            ack_timeout=0.05
+            ack_timeout=0.05,
+            env=self.env,
+            frame_pool=self.frame_pool,
+            metrics=self.metrics
         )
 
         # Initialize Beacon Manager with ProbChannel
@@ -552,18 +899,19 @@ class MACLayer:
             role=self.role,
             channel=self.channel,
             beacon_interval=1.0,
-            get_position_func=lambda: getattr(my_drone, 'coords', None)
+            get_position_func=lambda: getattr(my_drone, 'coords', None),
+            env=self.env
         )
 
         # Initialize Neighbor Table
-        self.neighbor_table = NeighborTable(expiry_timeout=10.0)
-
-        # Initialize Metrics
-        self.metrics = Metrics(node_id=self.node_id)
+        self.neighbor_table = NeighborTable(expiry_timeout=10.0, env=self.env)
 
         # State
         self.sequence_num = 0
-        self.received_data_frames = deque()
+        # Worker sends to C&C, C&C broadcasts
+        self._default_dest = cnd_id if role == DroneRole.WORKER_DRONE else None
+        # Bounded, the oldest frames are dropped if the upper layer does not keep up
+        self.received_data_frames = deque(maxlen=queue_capacity)
 
         # Validation
         if role == DroneRole.WORKER_DRONE and cnd_id is None:
@@ -584,28 +932,16 @@ class MACLayer:
         Returns:
             True if queued successfully, False if queue full
         """
-        # Determine destination depending on role
-        if self.role == DroneRole.WORKER_DRONE:
-            dest = self.cnd_id      # Worker sends to C&C
-        else:
-            dest = None     # C&C broadcast
-
-        # Create Data frame
-        frame = MACFrame(
-            frame_type=FrameType.DATA,
-            source=self.node_id,
-            dest=dest,
-            seq_num=self.sequence_num,
-            payload=payload
-        )
-        self.sequence_num += 1
+        # Create Data frame, the destination depends only on the role and is fixed at construction
+        seq_num = self.sequence_num
+        self.sequence_num = seq_num + 1
+        frame = self.frame_pool.acquire(FrameType.DATA, self.node_id, self._default_dest, seq_num, payload, self._now())
 
         # Enqueue
-        success = self.queue.enqueue(frame)
-        if not success:
+        if not self.queue.enqueue(frame):
             self.metrics.mac_queue_drops += 1
-
-        return success
+            return False
+        return True
 
     def receive(self) -> Optional[Tuple[str, bytes]]:
         """
@@ -625,52 +961,101 @@ class MACLayer:
         frame = self.received_data_frames.popleft()
         return frame.source, frame.payload
 
-    def process_outgoing(self):
+    def receive_batch(self, n: int = 32) -> List[Tuple[str, bytes]]:
+        """
+        Receive up to n data frames at once (called by Network Layer or GUI).
+
+        Args:
+            n: Maximum number of frames to return.
+
+        Returns:
+            List of (source_id, payload) tuples in arrival order, empty if no data is available.
+        """
+        received = self.received_data_frames
+        popleft = received.popleft
+        batch = []
+        for _ in range(min(n, len(received))):
+            frame = popleft()
+            batch.append((frame.source, frame.payload))
+        return batch
+
+    def process_outgoing(self, batch_size: int = 32):
         """
         Process outgoing queue, transmit waiting frames
 
-        Call this repeatedly in main even loop to send queue frames
+        Call this repeatedly in main even loop to send queue frames,
+        it is a simpy process: env.process(mac.process_outgoing())
+
+        Args:
+            batch_size: Maximum number of frames handled in one call. The metrics are
+                        counted locally and written once at the end of the batch.
         """
+        queue = self.queue
+        csma = self.csma
+        env = self.env
+        attempts = data_tx = ack_tx = beacon_tx = deferrals = 0
+        deferred_in_a_row = 0
 
-        # Check for ACK timeouts and handle retries
-        if not self.queue.is_empty():
-            frame = self.queue.dequeue()
-            if frame:
-                self.metrics.record_tx_attempt()
+        try:
+            for _ in range(batch_size):
+                frame = queue.dequeue()
+                if frame is None:
+                    break
+                attempts += 1
 
                 # Try CSMA/CA transmission
                 # This calls ProbChannel.unicast_put() or ProbChannel.broadcast_put()
-                success = self.csma.transmit_with_csma(frame)
+                success = yield env.process(csma.transmit_with_csma(frame))
 
                 if success:
-                    self.metrics.record_transmission(frame.frame_type)
-
-                    # If DATA frame to specific dest, register for ACK
-                    if frame.frame_type == FrameType.DATA and frame.dest:
-                        self.ack_retry.register_sent_frame(frame)
+                    deferred_in_a_row = 0
+                    frame_type = frame.frame_type
+                    if frame_type == _DATA:
+                        data_tx += 1
+                        # If DATA frame to specific dest, register for ACK
+                        if frame.dest:
+                            self.ack_retry.register_sent_frame(frame)
+                    elif frame_type == _ACK:
+                        ack_tx += 1
+                    elif frame_type == _BEACON:
+                        beacon_tx += 1
                 else:
                     # Channel is busy, retry
-                    self.queue.enqueue(frame)
-                    self.metrics.record_csma_deferral()
-
-    def send_beacon_if_needed(self):
+                    queue.enqueue(frame)
+                    deferrals += 1
+                    deferred_in_a_row += 1
+                    if deferred_in_a_row == 2:
+                        # The channel is most likely still busy, leave the rest for the next call
+                        break
+        finally:
+            self.metrics.record_tx_batch(attempts, data_tx, ack_tx, beacon_tx, deferrals)
+
+    def send_beacon_if_needed(self, targets: Optional[List] = None):
         """
         Sends beacon if it's time.
         Call this periodically in main.
+
+        Args:
+            targets: Optional list of drones to beacon, all drones when not given
         """
-        if self.beacon_manager.needs_to_send_beacon():
-            self.beacon_manager.send_beacon()
+        beacon_manager = self.beacon_manager
+        # Same test as BeaconManager.needs_to_send_beacon(), inlined since this runs every tick
+        if self._now() - beacon_manager.last_beacon_time >= beacon_manager.beacon_interval:
+            beacon_manager.send_beacon(targets)
             self.metrics.record_transmission(FrameType.BEACON)
 
-    def cleanup_neighbors(self):
+    def cleanup_neighbors(self, current_time: Optional[float] = None):
         """
         Remove expired neighbors from table
         Call this periodically (every 5-10 seconds)
 
+        Args:
+            current_time: Timestamp of this MAC tick, shared with the other calls made in the same tick
+
         Returns:
             Number of neighbors removed
         """
-        return self.neighbor_table.remove_expired()
+        return self.neighbor_table.remove_expired(current_time)
 
     def get_metrics(self) -> Dict:
         """
@@ -682,14 +1067,17 @@ class MACLayer:
         self.metrics.update_queue_drops(self.queue)
         return self.metrics.get_summary()
 
-    def get_neighbors(self) -> List[Neighbor]:
+    def get_neighbors(self, current_time: Optional[float] = None) -> List[Neighbor]:
         """
         Get list of active neighbors
 
+        Args:
+            current_time: Timestamp of this MAC tick, shared with the other calls made in the same tick
+
         Returns:
             List of Neighbor objects that have not expired
         """
-        return self.neighbor_table.get_active()
+        return self.neighbor_table.get_active(current_time)
 
     def should_move_closer_to_cnd(self) -> bool:
         """
@@ -710,10 +1098,7 @@ class MACLayer:
         # If weak signal and have data to send, move closer
         WEAK_SIGNAL_THRESHOLD = 0.3
 
-        if signal < WEAK_SIGNAL_THRESHOLD and not self.queue.is_empty():
-            return True
-
-        return False
+        return signal < WEAK_SIGNAL_THRESHOLD and self.queue.count > 0
 
 # ---------------------------------------------------------------------------------------------------------------------
 # METRICS TRACKER
@@ -722,9 +1107,10 @@ class Metrics:
     """
     Keep track of performance matrics.
     """
-    def __init__(self, node_id: str):
+    def __init__(self, node_id: str, env=None):
+        self._now = _clock(env)
         self.node_id = node_id
-        self.start_time = time.time()
+        self.start_time = self._now()
         
         # Transmission/Reception Counts
         self.tx_data_frames = 0
@@ -742,6 +1128,27 @@ class Metrics:
         self.total_retries = 0          # Total number of retransmissions
         self.mac_queue_drops = 0        # Frames dropped due to full MAC queue (from MACQueue)
 
+        # Returned by get_summary(), built once with every key in display order
+        self._summary: Dict = {
+            "node_id": node_id,
+            "runtime_sec": 0.0,
+            "--- Total Frames ---": "",
+            "total_tx_frames": 0,
+            "total_rx_frames": 0,
+            "data_tx_frames": 0,
+            "data_rx_frames": 0,
+            "--- Queue/CSMA Metrics ---": "",
+            "tx_attempts": 0,
+            "tx_successes": 0,
+            "tx_failures_max_retry": 0,
+            "total_retries": 0,
+            "csma_deferrals": 0,
+            "mac_queue_drops": 0,
+            "--- Derived Performance ---": "",
+            "data_tx_rate_per_sec": 0.0,
+            "tx_efficiency_percent": 0.0
+        }
+
     def record_tx_attempt(self):
         """Record a single attempt to transmit a frame via CSMA/CA."""
         self.tx_attempts += 1
@@ -752,20 +1159,29 @@ class Metrics:
 
     def record_transmission(self, frame_type: FrameType):
         """Record a frame successfully sent out onto the channel (CSMA/CA success)."""
-        if frame_type == FrameType.DATA:
+        if frame_type == _DATA:
             self.tx_data_frames += 1
-        elif frame_type == FrameType.ACK:
+        elif frame_type == _ACK:
             self.tx_ack_frames += 1
-        elif frame_type == FrameType.BEACON:
+        elif frame_type == _BEACON:
             self.tx_beacon_frames += 1
             
+    def record_tx_batch(self, attempts: int, data_frames: int, ack_frames: int, beacon_frames: int,
+                        deferrals: int):
+        """Record the counts of a batch of transmissions at once, see MACLayer.process_outgoing()."""
+        self.tx_attempts += attempts
+        self.tx_data_frames += data_frames
+        self.tx_ack_frames += ack_frames
+        self.tx_beacon_frames += beacon_frames
+        self.csma_deferrals += deferrals
+
     def record_reception(self, frame_type: FrameType):
         """Record a frame successfully received from the channel."""
-        if frame_type == FrameType.DATA:
+        if frame_type == _DATA:
             self.rx_data_frames += 1
-        elif frame_type == FrameType.ACK:
+        elif frame_type == _ACK:
             self.rx_ack_frames += 1
-        elif frame_type == FrameType.BEACON:
+        elif frame_type == _BEACON:
             self.rx_beacon_frames += 1
 
     def record_tx_success(self):
@@ -782,8 +1198,11 @@ class Metrics:
         self.mac_queue_drops = queue.get_drop_count()
 
     def get_summary(self) -> Dict:
-        """Generate a summary of all metrics."""
-        duration = time.time() - self.start_time
+        """
+        Generate a summary of all metrics.
+        The same dict is updated and returned on every call, copy it to keep a snapshot.
+        """
+        duration = self._now() - self.start_time
         
         # Calculate derived metrics
         data_tx_rate = self.tx_data_frames / duration if duration > 0 else 0
@@ -791,23 +1210,19 @@ class Metrics:
         total_rx_frames = self.rx_data_frames + self.rx_ack_frames + self.rx_beacon_frames
         tx_efficiency = (self.tx_successes / self.tx_attempts) * 100 if self.tx_attempts > 0 else 0
 
-        return {
-            "node_id": self.node_id,
-            "runtime_sec": round(duration, 2),
-            "--- Total Frames ---": "",
-            "total_tx_frames": total_tx_frames,
-            "total_rx_frames": total_rx_frames,
-            "data_tx_frames": self.tx_data_frames,
-            "data_rx_frames": self.rx_data_frames,
-            "--- Queue/CSMA Metrics ---": "",
-            "tx_attempts": self.tx_attempts,
-            "tx_successes": self.tx_successes,
-            "tx_failures_max_retry": self.tx_failures,
-            "total_retries": self.total_retries,
-            "csma_deferrals": self.csma_deferrals,
-            "mac_queue_drops": self.mac_queue_drops,
-            "--- Derived Performance ---": "",
-            "data_tx_rate_per_sec": round(data_tx_rate, 2),
-            "tx_efficiency_percent": round(tx_efficiency, 2)
-        }
-    
\ No newline at end of file
+        # Only the values change, the keys and separators were set in __init__
+        summary = self._summary
+        summary["runtime_sec"] = round(duration, 2)
+        summary["total_tx_frames"] = total_tx_frames
+        summary["total_rx_frames"] = total_rx_frames
+        summary["data_tx_frames"] = self.tx_data_frames
+        summary["data_rx_frames"] = self.rx_data_frames
+        summary["tx_attempts"] = self.tx_attempts
+        summary["tx_successes"] = self.tx_successes
+        summary["tx_failures_max_retry"] = self.tx_failures
+        summary["total_retries"] = self.total_retries
+        summary["csma_deferrals"] = self.csma_deferrals
+        summary["mac_queue_drops"] = self.mac_queue_drops
+        summary["data_tx_rate_per_sec"] = round(data_tx_rate, 2)
+        summary["tx_efficiency_percent"] = round(tx_efficiency, 2)
+        return summary
@@ -25,7 +25,8 @@ class CsmaCa:
         rng_mac: a Random class based on which we can call the function that generates the random number
         env: simulation environment created by simpy
         phy: the installed physical layer
-        channel_states: used to determine if the channel is idle
+        channel_states: used to occupy the channel
+        channel_usage: used to determine if the channel is idle, the channel bitmap when the simulator has one
         enable_ack: use ack or not
 
     References:
@@ -51,7 +52,13 @@ class CsmaCa:
         self.env = drone.env
         self.phy = Phy(self)
         self.channel_states = self.simulator.channel_states
+        if self.simulator.channel_bitmap is not None:
+            self.channel_usage = self.simulator.channel_bitmap
+        else:
+            self.channel_usage = self.channel_states
         self.enable_ack = True
+        # SIFS plus the ACK airtime, the channel stays occupied this long after a unicast data packet
+        self._ack_guard_time = config.SIFS_DURATION + config.ACK_PACKET_LENGTH / config.BIT_RATE * 1e6
 
         self.wait_ack_process_dict = dict()
         self.wait_ack_process_finish = dict()
@@ -87,7 +94,7 @@ class CsmaCa:
                 pkd.first_attempt_time = self.env.now
 
             # start listen the channel at backoff stage
-            self.env.process(self.listen(self.channel_states, self.simulator.drones, pkd))
+            self.env.process(self.listen(self.channel_usage, self.simulator.drones, pkd))
 
             logger.info('At time: %s (us) ---- UAV: %s should wait for %s to countdown its back-off counter',
                         self.env.now, self.my_drone.identifier, to_wait)
@@ -116,7 +123,7 @@ class CsmaCa:
 
                         pkd.increase_ttl()
                         self.phy.unicast(pkd, next_hop_id)  # note: unicast function should be executed first!
-                        yield self.env.timeout(pkd.packet_length / config.BIT_RATE * 1e6)  # transmission delay
+                        yield self.env.timeout(self.phy.transmission_delay(pkd))  # transmission delay
 
                         # only unicast data packets need to wait for ACK
                         logger.info('At time: %s (us) ---- UAV: %s starts to wait ACK for packet: %s',
@@ -131,12 +138,12 @@ class CsmaCa:
                             self.wait_ack_process_finish[key2] = 0  # indicate that this process hasn't finished
 
                             # continue to occupy the channel to prevent the ACK from being interfered
-                            yield self.env.timeout(config.SIFS_DURATION + config.ACK_PACKET_LENGTH / config.BIT_RATE * 1e6)
+                            yield self.env.timeout(self._ack_guard_time)
 
                     elif transmission_mode == 1:
                         pkd.increase_ttl()
                         self.phy.broadcast(pkd)
-                        yield self.env.timeout(pkd.packet_length / config.BIT_RATE * 1e6)
+                        yield self.env.timeout(self.phy.transmission_delay(pkd))
 
             except simpy.Interrupt:
                 already_wait = self.env.now - start_time
@@ -194,7 +201,7 @@ class CsmaCa:
         :return: none
         """
 
-        while not check_channel_availability(self.channel_states, sender_drone, drones):
+        while not check_channel_availability(self.channel_usage, sender_drone, drones):
             yield self.env.timeout(config.SLOT_DURATION)
 
     def listen(self, channel_states, drones, pkd):
@@ -202,7 +209,7 @@ class CsmaCa:
         When the drone waits until the channel is idle, it starts its own timer to count down, in this time, the drone
         needs to detect the state of the channel during this period, and if the channel is found to be busy again, the
         countdown process should be interrupted
-        :param channel_states: a dictionary, indicates the use of the channel by different drones
+        :param channel_states: a ChannelBitmap or a dictionary, indicates the use of the channel by different drones
         :param drones: a list, contains all drones in the simulation
         :param pkd: listen to the channel for which packet
         :return: none
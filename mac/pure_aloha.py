@@ -32,6 +32,8 @@ class PureAloha:
         self.phy = Phy(self)
         self.channel_states = self.simulator.channel_states
         self.enable_ack = True
+        # SIFS plus the ACK airtime, the channel stays occupied this long after a unicast data packet
+        self._ack_guard_time = config.SIFS_DURATION + config.ACK_PACKET_LENGTH / config.BIT_RATE * 1e6
 
         self.wait_ack_process_dict = dict()
         self.wait_ack_process_finish = dict()
@@ -66,7 +68,7 @@ class PureAloha:
 
             pkd.increase_ttl()
             self.phy.unicast(pkd, next_hop_id)  # note: unicast function should be executed first!
-            yield self.env.timeout(pkd.packet_length / config.BIT_RATE * 1e6)  # transmission delay
+            yield self.env.timeout(self.phy.transmission_delay(pkd))  # transmission delay
 
             if self.enable_ack:
                 # used to identify the process of waiting ack
@@ -76,12 +78,12 @@ class PureAloha:
                 self.wait_ack_process_finish[key2] = 0  # indicate that this process hasn't finished
 
                 # continue to occupy the channel to prevent the ACK from being interfered
-                yield self.env.timeout(config.SIFS_DURATION + config.ACK_PACKET_LENGTH / config.BIT_RATE * 1e6)
+                yield self.env.timeout(self._ack_guard_time)
 
         elif transmission_mode == 1:
             pkd.increase_ttl()
             self.phy.broadcast(pkd)
-            yield self.env.timeout(pkd.packet_length / config.BIT_RATE * 1e6)
+            yield self.env.timeout(self.phy.transmission_delay(pkd))
 
     def wait_ack(self, pkd):
         """
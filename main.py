@@ -1,6 +1,7 @@
 import simpy
 from utils import config
 from simulator.simulator import Simulator
+from utils.channel_bitmap import ChannelBitmap, ChannelResource
 from visualization.visualizer import SimulationVisualizer
 
 # Physical Layer 
@@ -21,13 +22,15 @@ from phy.channel_create import create_channel
 if __name__ == "__main__":
     # Simulation setup
     env = simpy.Environment()
-    channel_states = {i: simpy.Resource(env, capacity=1) for i in range(config.NUMBER_OF_DRONES)}
-    sim = Simulator(seed=2025, env=env, channel_states=channel_states, n_drones=config.NUMBER_OF_DRONES)
+    channel_bitmap = ChannelBitmap(config.NUMBER_OF_DRONES)
+    channel_states = {i: ChannelResource(env, channel_bitmap, i) for i in range(config.NUMBER_OF_DRONES)}
+    sim = Simulator(seed=2025, env=env, channel_states=channel_states, n_drones=config.NUMBER_OF_DRONES,
+                    channel_bitmap=channel_bitmap)
 
     # ====== Physical Layer Setup ================
     # Profile options: wifi_11n, wifi_11ac, wifi_direct
     selected_profile = wifi_direct
-    sim.channel = create_channel(env, wifi_11ac)
+    sim.channel = create_channel(env, wifi_11ac, seed=sim.seed)
     print(f"Using channel: {type(sim.channel).__name__} with loss_prob={getattr(sim.channel, 'loss_prob', None)}")
     print(f"Using tech profile: {selected_profile.name}")
 
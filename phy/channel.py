@@ -1,17 +1,106 @@
 import logging
-import copy
+from array import array
 from collections import defaultdict
 
 
+class Inbox:
+    """
+    Inbox of one receiver, stored as a structure of arrays: one column per message field instead of one
+    list per message. Scalar fields live in typed arrays, only the packets are Python objects.
+
+    A message is put as an immutable tuple (packet, send_time, src_id, channel_id). The "processed" flag
+    belongs to the receiver, it is kept in its own column, so a broadcast message can be shared by all
+    inboxes without copying it. Any other value, e.g. a MACFrame of mac/Link_MAC.py, is kept unchanged in
+    "other", in arrival order.
+
+    Attributes:
+        packet: list of the packets
+        send_time: the moment that each packet begins to be sent to the channel (us)
+        src: identifier of the transmitter of each packet
+        processed: 1 if the packet has been processed by the receiver, 0 otherwise
+        channel: sub-channel used to transmit each packet
+        pending: number of messages that have not been processed yet
+        other: values put on the channel that are not messages
+    """
+
+    __slots__ = ('packet', 'send_time', 'src', 'processed', 'channel', 'pending', 'other')
+
+    def __init__(self):
+        self.packet = []
+        self.send_time = array('d')
+        self.src = array('q')
+        self.processed = bytearray()
+        self.channel = array('q')
+        self.pending = 0
+        self.other = []
+
+    def append(self, message):
+        if type(message) is not tuple:
+            self.other.append(message)
+            return
+        packet, send_time, src_id, channel_id = message
+        self.packet.append(packet)
+        self.send_time.append(send_time)
+        self.src.append(src_id)
+        self.processed.append(0)
+        self.channel.append(channel_id)
+        self.pending += 1
+
+    def compact(self, keep):
+        """
+        Only keep the messages whose entry in "keep" is true, the order is preserved
+        :param keep: a sequence of booleans, one per message, only processed messages may be dropped
+        :return: none
+        """
+
+        indices = [i for i, k in enumerate(keep) if k]
+        packet, send_time, src, processed, channel = self.packet, self.send_time, self.src, self.processed, self.channel
+        self.packet = [packet[i] for i in indices]
+        self.send_time = array('d', [send_time[i] for i in indices])
+        self.src = array('q', [src[i] for i in indices])
+        self.processed = bytearray(processed[i] for i in indices)
+        self.channel = array('q', [channel[i] for i in indices])
+
+    def discard_processed(self, n):
+        """
+        Drop the processed messages among the first "n" ones, the unprocessed ones and the rest are kept in order
+        :param n: length of the prefix that may be cleaned
+        :return: none
+        """
+
+        processed = self.processed
+        if processed.find(0, 0, n) == -1:
+            # the whole prefix has been processed (the usual case): a slice deletion per column, no rebuild
+            del self.packet[:n]
+            del self.send_time[:n]
+            del self.src[:n]
+            del self.processed[:n]
+            del self.channel[:n]
+        else:
+            self.compact([not processed[i] if i < n else True for i in range(len(processed))])
+
+    def __len__(self):
+        return len(self.packet)
+
+    def __iter__(self):
+        # one [packet, send_time, src_id, processed, channel_id] list per message, for inspection only
+        return (list(m) for m in zip(self.packet, self.send_time, self.src, self.processed, self.channel))
+
+    def __repr__(self):
+        return repr(list(self))
+
+
 class Channel:
     """
     Wireless channel of the physical layer
 
     Format of pipes:
-    {UAV 0: [ [message 1], [message 2], ...],
-     UAV 1: [ [message 1], [message 3], ...],
+    {UAV 0: Inbox([message 1], [message 2], ...),
+     UAV 1: Inbox([message 1], [message 3], ...),
      ...
-     UAV N: [ [message m], [message n], ...]}
+     UAV N: Inbox([message m], [message n], ...)}
+
+    where each message is a tuple (packet, send_time, src_id, channel_id), see "Inbox"
 
     Attributes:
         env: simulation environment created by simpy
@@ -24,7 +113,7 @@ class Channel:
 
     def __init__(self, env):
         self.env = env
-        self.pipes = defaultdict(list)
+        self.pipes = defaultdict(Inbox)
 
     def broadcast_put(self, value):
         """
@@ -36,10 +125,10 @@ class Channel:
         if not self.pipes:
             logging.error('No inboxes available!')
 
-        # the sender "puts" packets to all inboxes in pipes separately
-        for key in self.pipes.keys():
-            value_copy = copy.copy(value)  # must be a copy of "value"
-            self.pipes[key].append(value_copy)
+        # the sender "puts" packets to all inboxes in pipes separately, the message is immutable and each
+        # inbox keeps its own processed flag, so no copy is needed
+        for inbox in self.pipes.values():
+            inbox.append(value)
 
     def unicast_put(self, value, dst_id):
         """
@@ -66,11 +155,10 @@ class Channel:
             if dst_id not in self.pipes.keys():
                 logging.error('There is no inbox for dst_id')
             else:
-                value_copy = copy.copy(value)  # must be a copy of "value"
-                self.pipes[dst_id].append(value_copy)
+                self.pipes[dst_id].append(value)
 
     def create_inbox_for_receiver(self, identifier):
-        # each receiver needs a list as its inbox
-        pipe = []
+        # each receiver needs its own inbox
+        pipe = Inbox()
         self.pipes[identifier] = pipe
         return pipe
@@ -1,7 +1,24 @@
-def create_channel(env, tech_profile):
-    channel_cls = getattr(tech_profile, 'channel_class', None)
-    channel_params = getattr(tech_profile, 'channel_params', {}) or {}
-    if channel_cls is None:
-        from .channel import Channel  # Fallback to default
-        channel_cls = Channel
+from .channel import Channel
+from .tech_profiles import wifi_11n, wifi_11ac, wifi_direct
+
+# channel class and keyword arguments of the known tech profiles, keyed by profile name
+_CHANNEL_REGISTRY = {
+    profile.name: (profile.channel_class or Channel, profile.channel_params)
+    for profile in (wifi_11n, wifi_11ac, wifi_direct)
+}
+
+
+def create_channel(env, tech_profile, seed=None):
+    """
+    Channel of the given tech profile
+    :param seed: seed of the channel's random draws (e.g. packet loss), usually "simulator.seed"; ignored by channel
+                 classes without random behaviour
+    """
+
+    entry = _CHANNEL_REGISTRY.get(tech_profile.name)
+    if entry is None:  # profile that is not registered, read it directly
+        entry = (tech_profile.channel_class or Channel, tech_profile.channel_params)
+    channel_cls, channel_params = entry
+    if seed is not None and getattr(channel_cls, 'accepts_seed', False):
+        return channel_cls(env, seed=seed, **channel_params)
     return channel_cls(env, **channel_params)
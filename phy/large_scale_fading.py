@@ -1,7 +1,40 @@
 import math
+import logging
+import functools
+import numpy as np
 from simulator.log import logger
 from utils import config
-from utils.util_function import euclidean_distance_3d, euclidean_distance_2d
+from utils.util_function import euclidean_distance_2d
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, path_loss_vector falls back to numpy broadcasting
+    njit = None
+
+# free-space path loss with exponent 2 is _PATH_LOSS_CONST / distance^2, so the squared distance is used directly
+_PATH_LOSS_CONST = (config.LIGHT_SPEED / (4 * math.pi * config.CARRIER_FREQUENCY)) ** 2
+
+# linear gains of the excess LoS/NLoS losses used in "probabilistic_los_path_loss"
+_ETA_LOS = 0.1
+_ETA_NLOS = 21
+_ETA_LOS_GAIN = 10 ** (_ETA_LOS / 10)
+_ETA_NLOS_GAIN = 10 ** (_ETA_NLOS / 10)
+
+
+if njit is not None:
+    @njit(fastmath=True, cache=True)
+    def _path_loss_batch(rx_coords, tx_coords, path_loss_const):
+        """Free-space path loss from each transmitter to the receiver, in a single pass without temporaries"""
+        path_loss = np.empty(tx_coords.shape[0])
+        for k in range(tx_coords.shape[0]):
+            dx = tx_coords[k, 0] - rx_coords[0]
+            dy = tx_coords[k, 1] - rx_coords[1]
+            dz = tx_coords[k, 2] - rx_coords[2]
+            distance_sq = dx * dx + dy * dy + dz * dz
+            path_loss[k] = path_loss_const / distance_sq if distance_sq != 0 else 1.0
+        return path_loss
+else:
+    _path_loss_batch = None
 
 
 def sinr_calculator(my_drone, main_drones_list, all_transmitting_drones_list):
@@ -11,7 +44,7 @@ def sinr_calculator(my_drone, main_drones_list, all_transmitting_drones_list):
     Parameters:
         my_drone: receiver drone
         main_drones_list: list of drones that wants to transmit packet to receiver
-        all_transmitting_drones_list: list of all drones currently transmitting packet
+        all_transmitting_drones_list: list of all drones currently transmitting packet, as (drone id, channel id)
 
     Returns:
         List of sinr of each main drone
@@ -20,52 +53,87 @@ def sinr_calculator(my_drone, main_drones_list, all_transmitting_drones_list):
     simulator = my_drone.simulator
     transmit_power = config.TRANSMITTING_POWER
     noise_power = config.NOISE_POWER
-
-    sinr_list = []  # record the sinr of all transmitter
+    drones = simulator.drones
     receiver = my_drone
 
-    for pair in main_drones_list:  # each pair includes the main drone id and the channel id
-        main_drone_id = pair[0]  # drone id of main transmitter
-        channel_id = pair[1]  # channel id of main transmitter
-        transmitter = simulator.drones[main_drone_id]
+    # common case: a single main link and no other drone transmitting, so nothing can interfere and neither the
+    # arrays nor the adjacent-channel lookup are needed
+    if len(main_drones_list) == 1:
+        main_id = main_drones_list[0][0]
+        if all(pair[0] == main_id for pair in all_transmitting_drones_list):
+            sinr = 10 * math.log10(transmit_power * general_path_loss(receiver, drones[main_id]) / noise_power)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info('At time: %s (us) ---- The SINR of main link between UAV (Tx) %s and UAV (Rx) %s is: %s',
+                            simulator.env.now, main_id, receiver.identifier, sinr)
+            return [sinr]
+
+    # each pair includes the drone id and the channel id, converted to (n, 2) arrays in one go
+    main_pairs = np.array(main_drones_list, dtype=np.int64).reshape(-1, 2)
+    main_ids = main_pairs[:, 0]
+    main_channels = main_pairs[:, 1]
+    interference_pairs = np.array(all_transmitting_drones_list, dtype=np.int64).reshape(-1, 2)
+    interference_ids = interference_pairs[:, 0]
+    interference_channels = interference_pairs[:, 1]
+
+    # path loss from every main transmitter and every transmitting drone to the receiver, computed at once
+    rx_coords = np.asarray(receiver.coords, dtype=float)
+    main_path_loss = path_loss_vector(rx_coords, np.array([drones[i].coords for i in main_ids], dtype=float))
+    receive_power = transmit_power * main_path_loss
+
+    # mask[i, j]: transmitting drone j interferes with main drone i (another drone on an overlapping sub-channel)
+    if len(interference_ids):
+        interference_path_loss = path_loss_vector(
+            rx_coords, np.array([drones[i].coords for i in interference_ids], dtype=float))
+        mask = my_drone.channel_assigner.adjacent_channel_interference_matrix(main_channels, interference_channels)
+        mask &= interference_ids[None, :] != main_ids[:, None]
+        interference_power = mask @ (transmit_power * interference_path_loss)
+    else:
+        mask = np.zeros((len(main_ids), 0), dtype=bool)
+        interference_power = np.zeros(len(main_ids))
+
+    sinr_array = 10 * np.log10(receive_power / (noise_power + interference_power))
+
+    collision = mask.any(axis=1)  # main links that suffer from interference
+    simulator.metrics.collision_num += int(collision.sum())
 
-        interference_list = [x[0] for x in all_transmitting_drones_list]
-        channel_list = [x[1] for x in all_transmitting_drones_list]
+    # the log arguments are only built when they are going to be written
+    if logger.isEnabledFor(logging.INFO):
+        now = simulator.env.now
+        for i in range(len(main_ids)):
+            if collision[i]:
+                logger.info('At time: %s (us) ---- Packets collision: Main node is: %s, interference node is: %s, ',
+                            now, main_ids[i], interference_ids[mask[i]].tolist())
 
-        main_link_path_loss = general_path_loss(receiver, transmitter)
-        receive_power = transmit_power * main_link_path_loss
-        interference_power = 0
+            logger.info('At time: %s (us) ---- The SINR of main link between UAV (Tx) %s and UAV (Rx) %s is: %s',
+                        now, main_ids[i], receiver.identifier, sinr_array[i])
 
-        real_interference_nodes = []
+    return sinr_array.tolist()
 
-        for i in range(0, len(interference_list)):
-            if interference_list[i] != main_drone_id:  # possible interference
-                if my_drone.channel_assigner.adjacent_channel_interference_check(channel_id, channel_list[i]):
-                    interference = simulator.drones[interference_list[i]]
-                    real_interference_nodes.append(interference_list[i])
 
-                    interference_link_path_loss = general_path_loss(receiver, interference)
-                    interference_power += transmit_power * interference_link_path_loss
-                else:
-                    # it means that two sub-channel is non-overlapping
-                    pass
+def path_loss_vector(rx_coords, tx_coords):
+    """
+    Vectorized version of "general_path_loss" for one receiver and several transmitters
 
-        sinr = 10 * math.log10(receive_power / (noise_power + interference_power))
+    Parameters:
+        rx_coords: (3,) array, position of the receiver
+        tx_coords: (K, 3) array, positions of the transmitters
 
-        if real_interference_nodes:
-            logger.info('At time: %s (us) ---- Packets collision: Main node is: %s, interference node is: %s, ',
-                        simulator.env.now, main_drone_id, real_interference_nodes)
+    Returns:
+        (K,) array of path loss
+    """
 
-            simulator.metrics.collision_num += 1
-        else:
-            pass
+    if _path_loss_batch is not None:
+        return _path_loss_batch(rx_coords, tx_coords, _PATH_LOSS_CONST)
 
-        logger.info('At time: %s (us) ---- The SINR of main link between UAV (Tx) %s and UAV (Rx) %s is: %s',
-                    simulator.env.now, main_drone_id, receiver.identifier, sinr)
+    diff = tx_coords - rx_coords
+    distance_sq = (diff * diff).sum(axis=-1)
 
-        sinr_list.append(sinr)
+    # co-located nodes have no loss, the divisor is replaced to avoid the division by zero
+    zero = distance_sq == 0
+    path_loss = _PATH_LOSS_CONST / np.where(zero, 1.0, distance_sq)
+    path_loss[zero] = 1
 
-    return sinr_list
+    return path_loss
 
 
 def general_path_loss(receiver, transmitter):
@@ -84,14 +152,15 @@ def general_path_loss(receiver, transmitter):
         path loss
     """
 
-    c = config.LIGHT_SPEED
-    fc = config.CARRIER_FREQUENCY
-    alpha = 2  # path loss exponent
-
-    distance = euclidean_distance_3d(receiver.coords, transmitter.coords)
+    p1 = receiver.coords
+    p2 = transmitter.coords
+    dx = p1[0] - p2[0]
+    dy = p1[1] - p2[1]
+    dz = p1[2] - p2[2]
+    distance_sq = dx * dx + dy * dy + dz * dz  # path loss exponent 2, no square root needed
 
-    if distance != 0:
-        path_loss = (c / (4 * math.pi * fc * distance)) ** alpha
+    if distance_sq != 0:
+        path_loss = _PATH_LOSS_CONST / distance_sq
     else:
         path_loss = 1
 
@@ -115,16 +184,13 @@ def probabilistic_los_path_loss(receiver, transmitter):
         path loss
     """
 
-    c = config.LIGHT_SPEED
-    fc = config.CARRIER_FREQUENCY
-    alpha = 2  # path loss exponent
-    eta_los = 0.1
-    eta_nlos = 21
     a = 4.88
     b = 0.429
 
-    distance = euclidean_distance_3d(receiver.coords, transmitter.coords)
-    horizontal_dist = euclidean_distance_2d(receiver, transmitter)
+    p1 = receiver.coords
+    p2 = transmitter.coords
+    distance_sq = (p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2 + (p1[2] - p2[2]) ** 2  # path loss exponent 2
+    horizontal_dist = euclidean_distance_2d(p1, p2)
     vertical_dist = max(receiver.coords[2], transmitter.coords[2])
 
     elevation_angle = math.atan(horizontal_dist / vertical_dist) * 180 / math.pi
@@ -132,9 +198,10 @@ def probabilistic_los_path_loss(receiver, transmitter):
     los_prob = 1 / (1 + a * math.exp(-b * (elevation_angle - a)))
     nlos_prob = 1 - los_prob
 
-    if distance != 0:
-        path_loss_los = ((c / (4 * math.pi * fc * distance)) ** alpha) * (10 ** (eta_los / 10))
-        path_loss_nlos = ((c / (4 * math.pi * fc * distance)) ** alpha) * (10 ** (eta_nlos / 10))
+    if distance_sq != 0:
+        free_space_loss = _PATH_LOSS_CONST / distance_sq
+        path_loss_los = free_space_loss * _ETA_LOS_GAIN
+        path_loss_nlos = free_space_loss * _ETA_NLOS_GAIN
     else:
         path_loss_los = 1
         path_loss_nlos = 1
@@ -143,6 +210,7 @@ def probabilistic_los_path_loss(receiver, transmitter):
     return path_loss
 
 
+@functools.lru_cache(maxsize=None)
 def maximum_communication_range():
     c = config.LIGHT_SPEED
     fc = config.CARRIER_FREQUENCY
@@ -156,3 +224,8 @@ def maximum_communication_range():
     max_comm_range = (c * (10 ** (path_loss_db / (alpha * 10)))) / (4 * math.pi * fc)
 
     return max_comm_range
+
+
+# the configuration does not change during a run, callers use these instead of calling the function again
+MAX_COMM_RANGE = maximum_communication_range()
+MAX_COMM_RANGE_SQUARED = MAX_COMM_RANGE * MAX_COMM_RANGE
@@ -1,16 +1,10 @@
 import logging
+from simulator.log import logger
 from utils import config
 from .tech_profiles import wifi_11n  # Import tech_profiles.py file that has our wifi objects.
 from .tech_profiles import wifi_11ac
 from .tech_profiles import wifi_direct
 
-# config logging
-logging.basicConfig(filename='running_log.log',
-                    filemode='w',  # there are two modes: 'a' and 'w'
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    level=config.LOGGING_LEVEL
-                    )
-
 
 class Phy:
     """
@@ -32,8 +26,29 @@ class Phy:
         self.my_drone = mac.my_drone
         self.profile = wifi_11n  # Our tech_profile object instantiation. 
 
+        # Per-bit constants, a transmission then costs one multiply instead of a divide and a multiply
+        self._energy_per_bit = config.TRANSMITTING_POWER / config.BIT_RATE  # joule per bit
+        self._bit_time_us = config.BIT_TRANSMISSION_TIME  # transmission time of one bit (us)
+
+        # The profile is shared and immutable, its fields are looked up once instead of on every packet
+        energy_model = self.profile.energy_model
+        self._profile_name = self.profile.name
+        self._profile_tx_mw = energy_model.get('TX', 'N/A')
+
         # Debug for knowing if it is using our tech_profile.
-        #print(f"[PHY INIT] drone {getattr(self.my_drone, 'identifier', '?')} assigned profile: {self.profile.name}, TX_mW={self.profile.energy_model.get('TX', 'N/A')}")
+        logger.debug('[PHY INIT] drone %s assigned profile: %s, TX_mW=%s',
+                     getattr(self.my_drone, 'identifier', '?'), self._profile_name, self._profile_tx_mw)
+
+    def transmission_delay(self, packet):
+        """
+        Time needed to put the packet on the air, in microseconds. The MAC protocols wait for it with a single
+        timeout per packet
+
+        Parameters:
+            packet: the packet that is transmitted
+        """
+
+        return packet.packet_length * self._bit_time_us
 
     def unicast(self, packet, next_hop_id):
         """
@@ -44,15 +59,17 @@ class Phy:
             next_hop_id: the identifier of the next hop drone
         """
 
-        # Debug
-        #print(f"[PHY TX] drone {self.my_drone.identifier} unicast using profile '{self.profile.name}' | profile_TX_mW={self.profile.energy_model.get('TX','N/A')} | config_TX={config.TRANSMITTING_POWER}")
+        # Debug, the arguments are only built when the DEBUG level is enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[PHY TX] drone %s unicast using profile '%s' | profile_TX_mW=%s | config_TX=%s",
+                         self.my_drone.identifier, self._profile_name, self._profile_tx_mw, config.TRANSMITTING_POWER)
 
         # energy consumption
-        energy_consumption = (packet.packet_length / config.BIT_RATE) * config.TRANSMITTING_POWER
+        energy_consumption = packet.packet_length * self._energy_per_bit
         self.my_drone.residual_energy -= energy_consumption
 
         # transmit through the channel
-        message = [packet, self.env.now, self.my_drone.identifier, 0, packet.channel_id]
+        message = (packet, self.env.now, self.my_drone.identifier, packet.channel_id)
 
         self.my_drone.simulator.channel.unicast_put(message, next_hop_id)
 
@@ -64,15 +81,17 @@ class Phy:
         packet: tha packet (hello packet, etc.) that needs to be broadcast
         """
 
-        # Debug
-        #print(f"[PHY TX] drone {self.my_drone.identifier} broadcast using profile '{self.profile.name}' | profile_TX_mW={self.profile.energy_model.get('TX','N/A')} | config_TX={config.TRANSMITTING_POWER}")
+        # Debug, the arguments are only built when the DEBUG level is enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[PHY TX] drone %s broadcast using profile '%s' | profile_TX_mW=%s | config_TX=%s",
+                         self.my_drone.identifier, self._profile_name, self._profile_tx_mw, config.TRANSMITTING_POWER)
 
         # energy consumption
-        energy_consumption = (packet.packet_length / config.BIT_RATE) * config.TRANSMITTING_POWER
+        energy_consumption = packet.packet_length * self._energy_per_bit
         self.my_drone.residual_energy -= energy_consumption
 
         # transmit through the channel
-        message = [packet, self.env.now, self.my_drone.identifier, 0, packet.channel_id]
+        message = (packet, self.env.now, self.my_drone.identifier, packet.channel_id)
 
         self.my_drone.simulator.channel.broadcast_put(message)
 
@@ -85,17 +104,19 @@ class Phy:
             dst_id_list: list of ids for multicast destinations
         """
 
-        # Debug
-        #print(f"[PHY TX] drone {self.my_drone.identifier} multicast using profile '{self.profile.name}' | profile_TX_mW={self.profile.energy_model.get('TX','N/A')} | config_TX={config.TRANSMITTING_POWER}")
+        # Debug, the arguments are only built when the DEBUG level is enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[PHY TX] drone %s multicast using profile '%s' | profile_TX_mW=%s | config_TX=%s",
+                         self.my_drone.identifier, self._profile_name, self._profile_tx_mw, config.TRANSMITTING_POWER)
 
         # a transmission delay should be considered
-        yield self.env.timeout(packet.packet_length / config.BIT_RATE * 1e6)
+        yield self.env.timeout(self.transmission_delay(packet))
 
         # energy consumption
-        energy_consumption = (packet.packet_length / config.BIT_RATE) * config.TRANSMITTING_POWER
+        energy_consumption = packet.packet_length * self._energy_per_bit
         self.my_drone.residual_energy -= energy_consumption
 
         # transmit through the channel
-        message = [packet, self.env.now, self.my_drone.identifier, packet.channel_id]
+        message = (packet, self.env.now, self.my_drone.identifier, packet.channel_id)
 
         self.my_drone.simulator.channel.multicast_put(message, dst_id_list)
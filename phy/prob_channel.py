@@ -1,22 +1,41 @@
 import random
+import numpy as np
+from simulator.log import logger
 from phy.channel import Channel
 
+_LOSS_POOL_SIZE = 1024  # number of uniform draws generated at once for "drop_packet"
+
 class ProbChannel(Channel):
     """
     Simple channel model that simply simulates
     data loss with a preset probability.
        
     """
-    def __init__(self, env, loss_prob=0.15): # 15% loss by default
+    accepts_seed = True  # "create_channel" passes the simulator seed
+
+    def __init__(self, env, loss_prob=0.15, seed=None): # 15% loss by default
         super().__init__(env) # calls original channel setup
         self.loss_prob = loss_prob # store loss probability
+        if seed is None:
+            # same source as before the numpy generator: the global "random", seeded from the simulator seed
+            seed = random.getrandbits(64)
+        self._rng = np.random.default_rng(seed) # all loss draws, reproducible for a given seed
+        # uniforms for "drop_packet" drawn a block at a time, kept as a list since indexing it is cheaper than
+        # indexing a numpy array. The first block is only drawn on the first unicast
+        self._loss_pool = None
+        self._loss_idx = _LOSS_POOL_SIZE
         
     def drop_packet(self):
         """
         decide whether packet is dropped
         returns True if random produces a number less than 0.15, False otherwise
         """
-        result = random.random() < self.loss_prob
+        if self._loss_idx == _LOSS_POOL_SIZE:
+            self._loss_pool = self._rng.random(_LOSS_POOL_SIZE).tolist()
+            self._loss_idx = 0
+        v = self._loss_pool[self._loss_idx]
+        self._loss_idx += 1
+        result = v < self.loss_prob
         #print(f"[DEBUG] drop_packet: loss_prob={self.loss_prob}, will_drop={result}")
         return result
     
@@ -25,12 +44,12 @@ class ProbChannel(Channel):
         """
         one-to-one communcation 
         calls our drop_packet method to decide if packet is lost
-        if lost, print it the log
+        if lost, write it to the log
         else call the original unicast_put method
         """
         #print(f"[DEBUG] ProbChannel.unicast_put called for dst_id={dst_id}")
         if self.drop_packet():
-            print(f"[CHANNEL] Unicast packet to drone {dst_id} LOST (p={self.loss_prob})")
+            logger.info('[CHANNEL] Unicast packet to drone %s LOST (p=%s)', dst_id, self.loss_prob)
             return
         super().unicast_put(value, dst_id)
         
@@ -41,22 +60,28 @@ class ProbChannel(Channel):
         """
         #print(f"[DEBUG] ProbChannel.broadcast_put called")
         #print(f"[DEBUG] pipes keys: {list(self.pipes.keys())}")
-        for key in self.pipes.keys():
-            if self.drop_packet():
-                print(f"[CHANNEL] Broadcast packet to drone {key} LOST (p={self.loss_prob})")
+        pipes = self.pipes
+        # one vectorized draw for all receivers instead of one drop_packet() call each, the surviving messages go
+        # straight into the inboxes since every key of "pipes" is known to have one
+        lost = (self._rng.random(len(pipes)) < self.loss_prob).tolist()
+        for (key, inbox), is_lost in zip(list(pipes.items()), lost):
+            if is_lost:
+                logger.info('[CHANNEL] Broadcast packet to drone %s LOST (p=%s)', key, self.loss_prob)
                 continue
-            super().unicast_put(value, key)
+            inbox.append(value)
             
     def multicast_put(self, value, dst_id_list):
         """
         same here just loops through specific group of drones (multicast)
         """
         #print(f"[DEBUG] ProbChannel.multicast_put called")
-        for dst_id in dst_id_list:
-            if self.drop_packet():
-                print(f"[CHANNEL] Multicast packet to drone {dst_id} LOST (p={self.loss_prob})")
+        lost = (self._rng.random(len(dst_id_list)) < self.loss_prob).tolist()
+        put = super().unicast_put  # resolved once instead of once per destination
+        for dst_id, is_lost in zip(dst_id_list, lost):
+            if is_lost:
+                logger.info('[CHANNEL] Multicast packet to drone %s LOST (p=%s)', dst_id, self.loss_prob)
                 continue
-            super().unicast_put(value, dst_id)
+            put(value, dst_id)
             
 # testing if code above works standalone before connecting to rest of simulator    
 
@@ -1,86 +1,166 @@
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from types import MappingProxyType
+import numpy as np
 from .prob_channel import ProbChannel
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional, "select_mcs_batch" falls back to numpy.searchsorted
+    njit = None
+
+# read-only values shared by several profiles, one object each instead of a fresh literal per profile
+_PROBCH_PARAMS = MappingProxyType({"loss_prob": 0.15})
+_EMPTY_PARAMS = MappingProxyType({})    # default "channel_params", shared instead of a new {} per profile
+_GI_DEFAULT = (400, 800)                # ns (Short/Long GI)
+_WIDTHS_HT = (20, 40)                   # MHz
+_BANDS_DUAL = ("2.4GHz", "5GHz")
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _select_mcs_kernel(snrs, thresholds, indices):
+        """Binary search of every SNR in the sorted thresholds, -1 below the lowest one"""
+        out = np.full(snrs.shape[0], -1, dtype=np.int64)
+        for i in range(snrs.shape[0]):
+            s = snrs[i]
+            lo = 0
+            hi = thresholds.shape[0]
+            while lo < hi:
+                m = (lo + hi) >> 1
+                if thresholds[m] <= s:
+                    lo = m + 1
+                else:
+                    hi = m
+            if lo > 0:
+                out[i] = indices[lo - 1]
+        return out
+else:
+    _select_mcs_kernel = None
+
+@dataclass(frozen=True, slots=True, eq=False)
 class WifiProfile:
-    def __init__(
-        self,
-        name,
-        mcs_table,
-        channel_widths,
-        tx_power_range,
-        rate_adaptation,
-        mesh_support,
-        energy_model,
-        frequency_bands,
-        spatial_streams,
-        guard_intervals,
-        max_packet_size,
-        channel_class=None,
-        channel_params=None,
-    ):
-        self.name = name
-        self.mcs_table = mcs_table
-        self.channel_widths = channel_widths
-        self.tx_power_range = tx_power_range
-        self.rate_adaptation = rate_adaptation
-        self.mesh_support = mesh_support
-        self.energy_model = energy_model
-        self.frequency_bands = frequency_bands
-        self.spatial_streams = spatial_streams
-        self.guard_intervals = guard_intervals
-        self.max_packet_size = max_packet_size
-
-        # now included prob_channels
-        self.channel_class = channel_class
-        self.channel_params = channel_params
+    """
+    Immutable description of a wireless technology, one instance is shared by every drone using it. Profiles compare
+    and hash by identity (eq=False), a field-based hash would fail on the "mcs_table" dict
+    """
+
+    name: str
+    mcs_table: dict
+    channel_widths: tuple
+    tx_power_range: tuple
+    rate_adaptation: str
+    mesh_support: bool
+    energy_model: MappingProxyType
+    frequency_bands: tuple
+    spatial_streams: int
+    guard_intervals: tuple
+    max_packet_size: int
+
+    # now included prob_channels
+    channel_class: type = None
+    channel_params: MappingProxyType = field(default_factory=lambda: _EMPTY_PARAMS)
+
+    # "mcs_table" as sorted parallel sequences, built once for "select_mcs"
+    _mcs_thresholds: tuple = field(init=False, repr=False, compare=False)
+    _mcs_indices: tuple = field(init=False, repr=False, compare=False)
+    _mcs_threshold_array: np.ndarray = field(init=False, repr=False, compare=False)
+    _mcs_index_array: np.ndarray = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        items = sorted(self.mcs_table.items())
+        thresholds = tuple(snr for snr, _ in items)
+        indices = tuple(mcs for _, mcs in items)
+        # the instance is frozen, the derived fields are set once here
+        object.__setattr__(self, '_mcs_thresholds', thresholds)
+        object.__setattr__(self, '_mcs_indices', indices)
+        object.__setattr__(self, '_mcs_threshold_array', np.array(thresholds, dtype=float))
+        object.__setattr__(self, '_mcs_index_array', np.array(indices, dtype=np.int64))
+
+    def select_mcs(self, snr):
+        """
+        Highest MCS index whose SNR threshold is not above the measured SNR
+
+        Parameters:
+            snr: measured SNR (dB), a scalar or an array of them
+
+        Returns:
+            the MCS index, -1 if the SNR is below every threshold; an int64 array for array input
+        """
+
+        if np.ndim(snr):
+            pos = np.searchsorted(self._mcs_threshold_array, snr, side='right') - 1
+            return np.where(pos >= 0, self._mcs_index_array[np.maximum(pos, 0)], -1)
+
+        # a scalar lookup is cheaper with bisect on a tuple than with a numpy call
+        pos = bisect_right(self._mcs_thresholds, snr) - 1
+        return self._mcs_indices[pos] if pos >= 0 else -1
+
+    def select_mcs_batch(self, snrs):
+        """
+        "select_mcs" for many links at once, compiled with numba when it is available
+
+        Parameters:
+            snrs: 1-D array of measured SNRs (dB)
+
+        Returns:
+            int64 array of MCS indices, -1 where the SNR is below every threshold
+        """
+
+        snrs = np.asarray(snrs, dtype=float)
+        if _select_mcs_kernel is not None:
+            return _select_mcs_kernel(snrs, self._mcs_threshold_array, self._mcs_index_array)
+        return self.select_mcs(snrs)
 
 
 wifi_11n = WifiProfile(
     name="802.11n",
     mcs_table={10: 0, 15: 1, 20: 2, 25: 3},  # SNR→MCS index mapping (test values future implementation)
-    channel_widths=[20, 40],                 # MHz
+    channel_widths=_WIDTHS_HT,
     tx_power_range=(1, 20),                  # dBm
     rate_adaptation="minstrel",
     mesh_support=False,
-    energy_model={"TX": 1000, "RX": 800, "Idle": 100, "Sleep": 5},  # mW (test values future implementation)
-    frequency_bands=["2.4GHz", "5GHz"],
+    # mW (test values future implementation)
+    energy_model=MappingProxyType({"TX": 1000, "RX": 800, "Idle": 100, "Sleep": 5}),
+    frequency_bands=_BANDS_DUAL,
     spatial_streams=2,
-    guard_intervals=[400, 800],               # ns
+    guard_intervals=_GI_DEFAULT,
     max_packet_size=7935,                      # bytes
     channel_class = ProbChannel,
-    channel_params = {"loss_prob": 0.15}
+    channel_params = _PROBCH_PARAMS
 )
 
 wifi_11ac = WifiProfile(
     name="802.11ac",
     # SNR → VHT MCS index (test values; expand/refine later)
     mcs_table={12: 0, 17: 1, 22: 2, 27: 3, 32: 4, 37: 5, 42: 6, 47: 7, 52: 8, 57: 9},
-    channel_widths=[20, 40, 80, 160],       # MHz
+    channel_widths=(20, 40, 80, 160),       # MHz
     tx_power_range=(1, 23),                 # dBm
     rate_adaptation="minstrel_ht",          # minstrel variant commonly used for HT/VHT
     mesh_support=False,
-    energy_model={"TX": 1200, "RX": 900, "Idle": 120, "Sleep": 5},  # mW (test values)
-    frequency_bands=["5GHz"],               # 11ac is primarily 5 GHz
+    energy_model=MappingProxyType({"TX": 1200, "RX": 900, "Idle": 120, "Sleep": 5}),  # mW (test values)
+    frequency_bands=("5GHz",),              # 11ac is primarily 5 GHz
     spatial_streams=4,                      # typical upper common config; spec allows up to 8
-    guard_intervals=[400, 800],             # ns (Short/Long GI)
+    guard_intervals=_GI_DEFAULT,
     max_packet_size=11454,                   # bytes (typical max A-MSDU/MPDU size for 11ac)
     channel_class = ProbChannel,
-    channel_params = {"loss_prob": 0.15}
+    channel_params = _PROBCH_PARAMS
 )
 
 wifi_direct = WifiProfile(
     name="Wi-Fi Direct (P2P)",
     # SNR → MCS index (test values; depends on underlying PHY, often 11n)
     mcs_table={10: 0, 15: 1, 20: 2, 25: 3, 30: 4, 35: 5, 40: 6, 45: 7},
-    channel_widths=[20, 40],                # MHz (common for P2P)
+    channel_widths=_WIDTHS_HT,              # common for P2P
     tx_power_range=(1, 20),                 # dBm (device/region dependent)
     rate_adaptation="minstrel",             # typical for 11n-based stacks
     mesh_support=False,                     # P2P is group-owner/client, not mesh
-    energy_model={"TX": 900, "RX": 700, "Idle": 100, "Sleep": 5},   # mW (test values)
-    frequency_bands=["2.4GHz", "5GHz"],     # depends on device capability
+    energy_model=MappingProxyType({"TX": 900, "RX": 700, "Idle": 100, "Sleep": 5}),   # mW (test values)
+    frequency_bands=_BANDS_DUAL,            # depends on device capability
     spatial_streams=2,                      # many P2P devices use 1–2 streams
-    guard_intervals=[400, 800],             # ns
+    guard_intervals=_GI_DEFAULT,
     max_packet_size=7935,                    # bytes (11n-style A-MSDU limit common in P2P)
     channel_class = ProbChannel,
-    channel_params = {"loss_prob": 0.15}
+    channel_params = _PROBCH_PARAMS
 )
 
@@ -21,27 +21,76 @@ import simpy
 import random
 import os
 import datetime
+import heapq
+from collections import OrderedDict, defaultdict
 
 HELLO_INTERVAL = 10
 HELLO_TIMEOUT = 30
 ROUTE_LIFETIME = 300
 NETWORK_DELAY = (1, 3)  # min/max delay for message delivery
+# random.uniform(*NETWORK_DELAY) is NETWORK_DELAY[0] + span * random(), the same value is computed inline
+_NET_A = NETWORK_DELAY[0]
+_NET_S = NETWORK_DELAY[1] - NETWORK_DELAY[0]
+_rand = random.random
+ZERO_DELAY = 1e-9  # deliveries drawn below this are handed over at once instead of through the event queue
+RREQ_SEEN_MAX = 1024  # duplicate-suppression entries kept per node, least recently seen dropped first
+RREQ_SEEN_TTL = 30  # an RREQ not seen again for this long is forgotten (like PATH_DISCOVERY_TIME in AODV)
+
+VERBOSE = True  # echo every log line to stdout, the log file is written either way
+LOG_BUFFER_SIZE = 1 << 16  # the log file is flushed when this is full and at the end, not after every line
+
+# payload opcodes, the first field of every message and the index of its handler in Node._handlers
+HELLO, RREQ, RREP, MSG = 0, 1, 2, 3
 
 # Global file handle for logging (opened in main)
 LOG_FH = None
 
+
+def path_to_list(path):
+    # RREQ/RREP paths are cons cells (node_id, previous_path) ending with None, so extending one by a hop is O(1)
+    # whatever its length; the list from the origin onwards is only built for logging
+    nodes = []
+    while path is not None:
+        nodes.append(path[0])
+        path = path[1]
+    nodes.reverse()
+    return nodes
+
+
+class RouteEntry:
+    # one route, updated in place when it is refreshed
+    __slots__ = ('next_hop', 'expiry', 'seq')
+
+    def __init__(self, next_hop, expiry, seq):
+        self.next_hop = next_hop
+        self.expiry = expiry
+        self.seq = seq  # seq of the live entry in network.route_expiry, older heap entries are stale
+
+
 class Node:
     def __init__(self, env, node_id, network):
         self.env = env
         self.id = node_id
         self.network = network
-        self.neighbors = set()
-        self.routing_table = {}  # dest -> (next_hop, lifetime_event)
+        self.neighbors = set()  # membership tests, only changed through "_add_neighbor"
+        # snapshot of "neighbors" in its iteration order and its text for the HELLO log, rebuilt on change only
+        self._neighbors_tuple = ()
+        self._neighbors_text = '[]'
+        # neighbor liveness: a neighbor not heard from for HELLO_TIMEOUT is dropped. One heap of deadlines per node,
+        # the monitor sleeps until the earliest one instead of scanning all neighbors periodically
+        self._hello_heap = []  # heap of (deadline, gen, neighbor)
+        self._hello_gen = {}  # neighbor -> gen of its live heap entry, older entries are stale
+        self._gen = 0
+        self._monitor_proc = None
+        self.routing_table = {}  # dest -> RouteEntry
+        self.routes_by_next_hop = {}  # next_hop -> {dest: None}, the destinations routed through it
         self.message_box = []
         self.logs = []
-        self.rreq_seen = set()  # (origin, rreq_id)
-        self.pending_msgs = []
+        self.rreq_seen = OrderedDict()  # (origin, rreq_id) -> last time seen, least recently seen first
+        self.pending_msgs = defaultdict(list)  # dest -> [(source, msg)] buffered until a route to dest is found
         self.seq = 0
+        self._handlers = (self._on_hello, self._on_rreq, self._on_rrep, self._on_msg)  # indexed by opcode
+        self._hello_payload = (HELLO, node_id)  # never changes, shared by every HELLO this node sends
         # starts a background process that continuously sends hello messages at fixed intervals in the simulation
         self.hello_proc = env.process(self._hello_sender())
 
@@ -49,141 +98,203 @@ class Node:
         entry = f"{self.env.now:>5.1f}: {text}"
         self.logs.append(entry)
         line = f"[{self.id}] {entry}"
-        print(line)
-        # also write to the global log file if available
-        try:
-            if LOG_FH is not None:
+        if VERBOSE:
+            print(line)
+        # also write to the global log file if available, buffered
+        if LOG_FH is not None:
+            try:
                 LOG_FH.write(line + "\n")
-                LOG_FH.flush()
-        except Exception:
-            # don't let logging errors break the simulation
-            pass
+            except Exception:
+                # don't let logging errors break the simulation
+                pass
 
     def _delay(self):
-        return random.uniform(*NETWORK_DELAY)
+        return _rand() * _NET_S + _NET_A
 
     def _hello_sender(self):
         # Periodically send HELLO to neighbors (simulated)
         while True:
             yield self.env.timeout(HELLO_INTERVAL)
-            for n in list(self.neighbors):
-                self.network.send(self.id, n, ("HELLO", self.id))
-            self.log(f"Sent HELLO to {list(self.neighbors)}")
+            self.network.broadcast(self.id, self._neighbors_tuple, self._hello_payload)
+            self.log(f"Sent HELLO to {self._neighbors_text}")
+
+    def _add_neighbor(self, n):
+        self._refresh_neighbor(n)
+        if n in self.neighbors:
+            return
+        self.neighbors.add(n)
+        self._neighbors_tuple = tuple(self.neighbors)
+        self._neighbors_text = str(list(self._neighbors_tuple))
+
+    def _remove_neighbor(self, n):
+        self.neighbors.discard(n)
+        self._neighbors_tuple = tuple(self.neighbors)
+        self._neighbors_text = str(list(self._neighbors_tuple))
+
+    def _refresh_neighbor(self, n):
+        # a new deadline supersedes the old heap entry of "n"
+        self._gen += 1
+        self._hello_gen[n] = self._gen
+        heapq.heappush(self._hello_heap, (self.env.now + HELLO_TIMEOUT, self._gen, n))
+        if self._monitor_proc is None:
+            self._monitor_proc = self.env.process(self._neighbor_monitor())
+
+    def _neighbor_monitor(self):
+        # deadlines are pushed in time order, so the head of the heap is always the next one to check
+        heap = self._hello_heap
+        while heap:
+            deadline = heap[0][0]
+            if deadline > self.env.now:
+                yield self.env.timeout(deadline - self.env.now)
+                continue
+            _, gen, n = heapq.heappop(heap)
+            if self._hello_gen.get(n) != gen:
+                continue  # heard from it again since
+            del self._hello_gen[n]
+            self._remove_neighbor(n)
+            self.log(f"Neighbor {n} timed out")
+            self._invalidate_routes_through(n)
+        self._monitor_proc = None
 
     def add_neighbors(self, neighbors):
         for n in neighbors:
-            self.neighbors.add(n)
+            self._add_neighbor(n)
             # install direct route
             self._install_route(n, n)
         self.log(f"Neighbors set -> {sorted(self.neighbors)}")
 
     def _install_route(self, dest, next_hop):
-        # cancel old lifetime if exists
-        if dest in self.routing_table:
-            ev = self.routing_table[dest][1]
-            if ev and not ev.triggered:
-                ev.interrupt('replace')
-        # schedule lifetime expiry
-        lifetime = self.env.process(self._route_lifetime(dest))
-        self.routing_table[dest] = (next_hop, lifetime)
-
-    def _route_lifetime(self, dest):
-        try:
-            yield self.env.timeout(ROUTE_LIFETIME)
-            # expire
-            if dest in self.routing_table:
-                del self.routing_table[dest]
-                self.log(f"Route to {dest} expired")
-        except simpy.Interrupt:
-            # replaced or refreshed
-            return
+        # a refresh only supersedes the old heap entry, nothing has to be interrupted
+        expiry = self.env.now + ROUTE_LIFETIME
+        seq = self.network.schedule_route_expiry(expiry, self, dest)
+        entry = self.routing_table.get(dest)
+        if entry is None:
+            self.routing_table[dest] = RouteEntry(next_hop, expiry, seq)
+        else:
+            if entry.next_hop != next_hop:
+                self._unindex_route(entry.next_hop, dest)
+            entry.next_hop = next_hop
+            entry.expiry = expiry
+            entry.seq = seq
+        self.routes_by_next_hop.setdefault(next_hop, {})[dest] = None
+
+    def _unindex_route(self, next_hop, dest):
+        bucket = self.routes_by_next_hop[next_hop]
+        del bucket[dest]
+        if not bucket:
+            del self.routes_by_next_hop[next_hop]
+
+    def _invalidate_routes_through(self, next_hop):
+        # drop every route whose next hop is "next_hop", found through the index instead of a table scan
+        for dest in self.routes_by_next_hop.pop(next_hop, ()):
+            del self.routing_table[dest]  # its heap entry becomes stale
+            self.log(f"Route to {dest} invalidated, next hop {next_hop} lost")
+
+    def _expire_route(self, dest, seq):
+        # called by the network when a heap entry of this node is due
+        entry = self.routing_table.get(dest)
+        if entry is None or entry.seq != seq:
+            return  # replaced or refreshed
+        # expire
+        del self.routing_table[dest]
+        self._unindex_route(entry.next_hop, dest)
+        self.log(f"Route to {dest} expired")
+
+    def _remember_rreq(self, key):
+        # True if the RREQ is new (or was forgotten), False for a duplicate. LRU bounded by RREQ_SEEN_MAX, entries
+        # not seen for RREQ_SEEN_TTL are evicted from the front since the order is also the order of the times
+        now = self.env.now
+        seen = self.rreq_seen
+        last_seen = seen.get(key)
+        is_new = last_seen is None or now - last_seen > RREQ_SEEN_TTL
+        seen[key] = now
+        seen.move_to_end(key)
+        while len(seen) > RREQ_SEEN_MAX or now - next(iter(seen.values())) > RREQ_SEEN_TTL:
+            seen.popitem(last=False)
+        return is_new
 
     def receive(self, src, payload):
-        typ = payload[0]
-        if typ == 'HELLO':
-            # refresh neighbor liveness and route
-            self.log(f"Received HELLO from {src}")
-            if src not in self.neighbors:
-                # treat as neighbor addition
-                self.neighbors.add(src)
-            self._install_route(src, src)
-        elif typ == 'RREQ':
-            (__, origin, rreq_id, dst, path) = payload
-            key = (origin, rreq_id)
-            if key in self.rreq_seen:
-                return
-            self.rreq_seen.add(key)
-            # record reverse path
-            reverse_next = path[-1] if path else src
-            self._install_route(origin, src)
-            self.log(f"RREQ for {dst} from {origin}, path={path}")
-            if self.id == dst:
-                # send RREP back along reverse path
-                self.log(f"I am dest {dst}; sending RREP to {origin}")
-                self.network.send(self.id, src, ("RREP", self.id, origin, list(path)+[self.id]))
-            else:
-                # forward RREQ
-                new_path = list(path) + [self.id]
-                for n in list(self.neighbors):
-                    if n != src:
-                        self.network.send(self.id, n, ("RREQ", origin, rreq_id, dst, new_path))
-        elif typ == 'RREP':
-            (_, rep_src, origin, rep_path) = payload
-            self.log(f"RREP received from {rep_src} for {origin}; path={rep_path}")
-            # install route to rep_src via src
-            self._install_route(rep_src, src)
-            # if I'm the origin, route established; otherwise forward back
-            if self.id == origin:
-                self.log(f"Route to {rep_src} established at origin {origin}")
-                # send any pending messages
-                to_send = [m for m in self.pending_msgs if m[0]==rep_src]
-                for m in to_send:
-                    self._send_user_message(m[1], rep_src, m[2])
-                    self.pending_msgs.remove(m)
-            else:
-                # forward towards origin using routing table
-                if origin in self.routing_table:
-                    next_hop = self.routing_table[origin][0]
-                    self.network.send(self.id, next_hop, payload)
-        elif typ == 'MSG':
-            (_, origin, dest, msg) = payload
-            if dest == self.id:
-                self.message_box.append((origin, msg))
-                self.log(f"Message received from {origin}: {msg}")
+        # the first field of every payload is its opcode, which indexes the handler tuple directly
+        self._handlers[payload[0]](src, payload)
+
+    def _on_hello(self, src, payload):
+        # refresh neighbor liveness and route
+        self.log(f"Received HELLO from {src}")
+        # treat as neighbor addition if it is a new one
+        self._add_neighbor(src)
+        self._install_route(src, src)
+
+    def _on_rreq(self, src, payload):
+        (__, origin, rreq_id, dst, path) = payload
+        if not self._remember_rreq((origin, rreq_id)):
+            return
+        # record reverse path
+        reverse_next = path[0] if path is not None else src
+        self._install_route(origin, src)
+        self.log(f"RREQ for {dst} from {origin}, path={path_to_list(path)}")
+        if self.id == dst:
+            # send RREP back along reverse path
+            self.log(f"I am dest {dst}; sending RREP to {origin}")
+            self.network.send(self.id, src, (RREP, self.id, origin, (self.id, path)))
+        else:
+            # forward RREQ, one payload shared by all neighbors
+            self.network.broadcast(self.id, [n for n in self._neighbors_tuple if n != src],
+                                   (RREQ, origin, rreq_id, dst, (self.id, path)))
+
+    def _on_rrep(self, src, payload):
+        (_, rep_src, origin, rep_path) = payload
+        self.log(f"RREP received from {rep_src} for {origin}; path={path_to_list(rep_path)}")
+        # install route to rep_src via src
+        self._install_route(rep_src, src)
+        # if I'm the origin, route established; otherwise forward back
+        if self.id == origin:
+            self.log(f"Route to {rep_src} established at origin {origin}")
+            # send any pending messages, only the ones buffered for rep_src are looked at
+            for source, msg in self.pending_msgs.pop(rep_src, ()):
+                self._send_user_message(source, rep_src, msg)
+        else:
+            # forward towards origin using routing table
+            entry = self.routing_table.get(origin)
+            if entry is not None:
+                self.network.send(self.id, entry.next_hop, payload)
+
+    def _on_msg(self, src, payload):
+        (_, origin, dest, msg) = payload
+        if dest == self.id:
+            self.message_box.append((origin, msg))
+            self.log(f"Message received from {origin}: {msg}")
+        else:
+            # forward if route exists
+            entry = self.routing_table.get(dest)
+            if entry is not None:
+                self.network.send(self.id, entry.next_hop, payload)
             else:
-                # forward if route exists
-                if dest in self.routing_table:
-                    nh = self.routing_table[dest][0]
-                    self.network.send(self.id, nh, payload)
-                else:
-                    # initiate RREQ using per-node seq id
-                    rreq_id = self.seq
-                    self.seq += 1
-                    self.log(f"No route to {dest}; broadcasting RREQ")
-                    for n in list(self.neighbors):
-                        self.network.send(self.id, n, ("RREQ", self.id, rreq_id, dest, [self.id]))
-                    # buffer message
-                    self.pending_msgs.append((dest, self.id, msg))
+                # initiate RREQ using per-node seq id
+                rreq_id = self.seq
+                self.seq += 1
+                self.log(f"No route to {dest}; broadcasting RREQ")
+                self.network.broadcast(self.id, self._neighbors_tuple, (RREQ, self.id, rreq_id, dest, (self.id, None)))
+                # buffer message
+                self.pending_msgs[dest].append((self.id, msg))
 
     def _send_user_message(self, source, dest, msg):
         # used to send buffered messages after route discovery
-        payload = ("MSG", source, dest, msg)
-        if dest in self.routing_table:
-            nh = self.routing_table[dest][0]
-            self.network.send(self.id, nh, payload)
+        payload = (MSG, source, dest, msg)
+        entry = self.routing_table.get(dest)
+        if entry is not None:
+            self.network.send(self.id, entry.next_hop, payload)
         else:
             # initiate route discovery from origin node and buffer the message
             rreq_id = self.seq
             self.seq += 1
             self.log(f"No route to {dest}; origin broadcasting RREQ")
-            for n in list(self.neighbors):
-                self.network.send(self.id, n, ("RREQ", self.id, rreq_id, dest, [self.id]))
+            self.network.broadcast(self.id, self._neighbors_tuple, (RREQ, self.id, rreq_id, dest, (self.id, None)))
             # buffer message so it will be sent when route is found
-            self.pending_msgs.append((dest, self.id, msg))
+            self.pending_msgs[dest].append((self.id, msg))
 
     # CLI-like helpers used by the script runner
     def show_route(self):
-        self.log(f"Routing table: { {k:v[0] for k,v in self.routing_table.items()} }")
+        self.log(f"Routing table: { {k:v.next_hop for k,v in self.routing_table.items()} }")
 
     def show_messages(self):
         self.log(f"Messages: {self.message_box}")
@@ -195,6 +306,30 @@ class Network:
     def __init__(self, env):
         self.env = env
         self.nodes = {}
+        # route lifetimes of all nodes: one heap and one process instead of one process per route
+        self.route_expiry = []  # heap of (expiry_time, seq, node, dest)
+        self._expiry_seq = 0
+        self._expiry_proc = None
+
+    def schedule_route_expiry(self, expiry, node, dest):
+        # returns the seq of the new entry, the node keeps it to recognize its live entry
+        self._expiry_seq += 1
+        heapq.heappush(self.route_expiry, (expiry, self._expiry_seq, node, dest))
+        if self._expiry_proc is None:
+            self._expiry_proc = self.env.process(self._route_expiry_loop())
+        return self._expiry_seq
+
+    def _route_expiry_loop(self):
+        # every route lives ROUTE_LIFETIME, so a new entry never expires before the current head of the heap
+        heap = self.route_expiry
+        while heap:
+            expiry = heap[0][0]
+            if expiry > self.env.now:
+                yield self.env.timeout(expiry - self.env.now)
+                continue
+            _, seq, node, dest = heapq.heappop(heap)
+            node._expire_route(dest, seq)
+        self._expiry_proc = None
 
     def add_node(self, node_id):
         self.nodes[node_id] = Node(self.env, node_id, self)
@@ -203,28 +338,33 @@ class Network:
         # simulate network delay
         if dst not in self.nodes:
             return
-        delay = random.uniform(*NETWORK_DELAY)
-        # schedule delivery
-        def deliver(env, delay, dst, src, payload):
-            yield env.timeout(delay)
-            # deliver
-            self.nodes[dst].receive(src, payload)
-        self.env.process(deliver(self.env, delay, dst, src, payload))
-
-
-def run_script(env, network, num_nodes, script_file):
-    # Read script
-    try:
-        with open(script_file, 'r') as f:
-            lines = [l.strip() for l in f if l.strip()]
-    except FileNotFoundError:
-        print('Script file not found:', script_file)
-        return
-
-    # Small helper to map 'n1'.. to node ids
-    def get_node(n):
-        return n
-
+        delay = _rand() * _NET_S + _NET_A
+        node = self.nodes[dst]
+        if delay < ZERO_DELAY:
+            node.receive(src, payload)  # no event round trip for an immediate delivery
+            return
+        # schedule delivery: a bare timeout whose callback delivers, no generator or process per message
+        self.env.timeout(delay).callbacks.append(lambda _event: node.receive(src, payload))
+
+    def broadcast(self, src, dsts, payload):
+        # same as calling "send" for every destination in order (same delays drawn), with the lookups done once
+        nodes = self.nodes
+        env = self.env
+        for dst in dsts:
+            node = nodes.get(dst)
+            if node is None:
+                continue
+            delay = _rand() * _NET_S + _NET_A
+            if delay < ZERO_DELAY:
+                node.receive(src, payload)
+                continue
+            env.timeout(delay).callbacks.append(lambda _event, node=node: node.receive(src, payload))
+
+
+def compile_script(network, lines):
+    """Turn the script lines into zero-argument callables, one per simulated time step"""
+    nodes = network.nodes
+    plan = []
     for line in lines:
         tokens = line.split()
         # support optional leading time/token: if first token is numeric treat it as time and strip it
@@ -233,20 +373,15 @@ def run_script(env, network, num_nodes, script_file):
         if not tokens:
             continue
         cmd = tokens[0]
+        # problems are reported when the line is reached, as if it was executed
+        fn = lambda line=line, cmd=cmd: print('Malformed %s line:' % cmd, line)
         if cmd == 'add_neighbors':
             # expected: add_neighbors <neighbor> to <target>
             if len(tokens) >= 4 and tokens[2] == 'to':
-                neighbor = tokens[1]
-                target = tokens[3]
-                env.process(_run_at(env, network, 0, lambda neighbor=neighbor, target=target: network.nodes[target].add_neighbors([neighbor])))
-            else:
-                print('Malformed add_neighbors line:', line)
-        elif cmd == 'show_route':
+                fn = lambda node=nodes[tokens[3]], neighbor=tokens[1]: node.add_neighbors([neighbor])
+        elif cmd in ('show_route', 'show_messages', 'show_log'):
             if len(tokens) >= 2:
-                target = tokens[1]
-                env.process(_run_at(env, network, 0, lambda target=target: network.nodes[target].show_route()))
-            else:
-                print('Malformed show_route line:', line)
+                fn = getattr(nodes[tokens[1]], cmd)
         elif cmd == 'send_message':
             # send_message <src> to <dst> <msg-with-@>
             if len(tokens) >= 4 and tokens[2] == 'to':
@@ -254,30 +389,28 @@ def run_script(env, network, num_nodes, script_file):
                 dst = tokens[3]
                 msg = ' '.join(tokens[4:]) if len(tokens) > 4 else ''
                 msg = ' '.join(msg.split('@'))
-                env.process(_run_at(env, network, 0, lambda s=src, d=dst, m=msg: network.nodes[s]._send_user_message(s, d, m)))
-            else:
-                print('Malformed send_message line:', line)
-        elif cmd == 'show_messages':
-            if len(tokens) >= 2:
-                target = tokens[1]
-                env.process(_run_at(env, network, 0, lambda target=target: network.nodes[target].show_messages()))
-            else:
-                print('Malformed show_messages line:', line)
-        elif cmd == 'show_log':
-            if len(tokens) >= 2:
-                target = tokens[1]
-                env.process(_run_at(env, network, 0, lambda target=target: network.nodes[target].show_log()))
-            else:
-                print('Malformed show_log line:', line)
+                fn = lambda node=nodes[src], s=src, d=dst, m=msg: node._send_user_message(s, d, m)
         else:
-            print('Unknown command in script:', cmd)
-        # advance simulation time a little between commands
-        yield env.timeout(1)
+            fn = lambda cmd=cmd: print('Unknown command in script:', cmd)
+        plan.append(fn)
+    return plan
 
 
-def _run_at(env, network, delay, func):
-    yield env.timeout(delay)
-    func()
+def run_script(env, network, num_nodes, script_file):
+    # Read script
+    try:
+        with open(script_file, 'r') as f:
+            lines = [l.strip() for l in f if l.strip()]
+    except FileNotFoundError:
+        print('Script file not found:', script_file)
+        return
+
+    # parsed once up front, the simulation only runs the commands
+    plan = compile_script(network, lines)
+    for fn in plan:
+        fn()
+        # advance simulation time a little between commands
+        yield env.timeout(1)
 
 
 def main():
@@ -294,7 +427,7 @@ def main():
         base = os.path.basename(script)
         ts = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
         logname = f"simpy_sim_{base}_{ts}.log"
-        LOG_FH = open(logname, 'w', encoding='utf-8')
+        LOG_FH = open(logname, 'w', encoding='utf-8', buffering=LOG_BUFFER_SIZE)
         LOG_FH.write(f"SimPy AODV simulation log - script={script} run_at={ts}\n")
         LOG_FH.write('---\n')
         LOG_FH.flush()
@@ -1,4 +1,3 @@
-import copy
 import random
 from simulator.log import logger
 from entities.packet import DataPacket, AckPacket
@@ -6,6 +5,7 @@ from topology.virtual_force.vf_packet import VfPacket
 from routing.dsdv.dsdv_packet import DsdvHelloPacket
 from routing.dsdv.dsdv_routing_table import DsdvRoutingTable
 from utils import config
+from utils.random_pool import hello_jitter_pool
 
 
 class Dsdv:
@@ -40,6 +40,7 @@ class Dsdv:
         self.simulator = simulator
         self.my_drone = my_drone
         self.rng_routing = random.Random(self.my_drone.identifier + self.my_drone.simulator.seed + 10)
+        self._hello_jitter = hello_jitter_pool(self.my_drone)
         self.hello_interval = 0.5 * 1e6  # broadcast routing table periodically
         self.purge_interval = 0.5 * 1e6  # check broken links periodically
         self.check_interval = 0.6 * 1e6  # check waiting list of drone periodically
@@ -110,7 +111,7 @@ class Dsdv:
     def broadcast_hello_packet_periodically(self):
         while True:
             self.broadcast_hello_packet(self.my_drone)
-            jitter = self.rng_routing.randint(1000, 2000)  # delay jitter
+            jitter = self._hello_jitter.next()  # delay jitter
             yield self.simulator.env.timeout(self.hello_interval+jitter)
 
     def next_hop_selection(self, packet):
@@ -179,7 +180,7 @@ class Dsdv:
                     self.my_drone.transmitting_queue.put(hello_pkd)
 
         elif isinstance(packet, DataPacket):
-            packet_copy = copy.copy(packet)
+            packet_copy = packet.clone_for_forward()
             if packet_copy.dst_drone.identifier == self.my_drone.identifier:
                 if packet_copy.packet_id not in self.simulator.metrics.datapacket_arrived:
                     self.simulator.metrics.calculate_metrics(packet_copy)
@@ -280,17 +281,18 @@ class Dsdv:
         while True:
             if not self.my_drone.sleep:
                 yield self.simulator.env.timeout(self.check_interval)
+                remaining = []
                 for waiting_pkd in self.my_drone.waiting_list:
                     if self.simulator.env.now > waiting_pkd.creation_time + waiting_pkd.deadline:
-                        self.my_drone.waiting_list.remove(waiting_pkd)
+                        continue  # expired, not carried over to the next check
                     else:
                         has_route, packet, enquire = self.next_hop_selection(waiting_pkd)
 
                         if has_route:
                             self.my_drone.transmitting_queue.put(waiting_pkd)
-                            self.my_drone.waiting_list.remove(waiting_pkd)
                         else:
-                            pass
+                            remaining.append(waiting_pkd)
+                self.my_drone.waiting_list[:] = remaining
             else:
                 break
 
@@ -1,4 +1,3 @@
-import copy
 import random
 from simulator.log import logger
 from entities.packet import DataPacket, AckPacket
@@ -6,6 +5,7 @@ from topology.virtual_force.vf_packet import VfPacket
 from routing.greedy.greedy_neighbor_table import GreedyNeighborTable
 from routing.greedy.greedy_packet import GreedyHelloPacket
 from utils import config
+from utils.random_pool import hello_jitter_pool
 
 
 class Greedy:
@@ -37,6 +37,7 @@ class Greedy:
         self.simulator = simulator
         self.my_drone = my_drone
         self.rng_routing = random.Random(self.my_drone.identifier + self.my_drone.simulator.seed + 10)
+        self._hello_jitter = hello_jitter_pool(self.my_drone)
         self.hello_interval = 0.5 * 1e6  # broadcast hello packet every 0.5s
         self.check_interval = 0.6 * 1e6
         self.neighbor_table = GreedyNeighborTable(self.simulator.env, my_drone)
@@ -66,7 +67,7 @@ class Greedy:
     def broadcast_hello_packet_periodically(self):
         while True:
             self.broadcast_hello_packet(self.my_drone)
-            jitter = self.rng_routing.randint(1000, 2000)  # delay jitter
+            jitter = self._hello_jitter.next()  # delay jitter
             yield self.simulator.env.timeout(self.hello_interval + jitter)
 
     def next_hop_selection(self, packet):
@@ -116,7 +117,7 @@ class Greedy:
             self.neighbor_table.print_neighbor(self.my_drone)
 
         elif isinstance(packet, DataPacket):
-            packet_copy = copy.copy(packet)
+            packet_copy = packet.clone_for_forward()
 
             if packet_copy.dst_drone.identifier == self.my_drone.identifier:
                 if packet_copy.packet_id not in self.simulator.metrics.datapacket_arrived:
@@ -226,17 +227,18 @@ class Greedy:
         while True:
             if not self.my_drone.sleep:
                 yield self.simulator.env.timeout(self.check_interval)
+                remaining = []
                 for waiting_pkd in self.my_drone.waiting_list:
                     if self.simulator.env.now > waiting_pkd.creation_time + waiting_pkd.deadline:
-                        self.my_drone.waiting_list.remove(waiting_pkd)
+                        continue  # expired, not carried over to the next check
                     else:
                         dst_drone = waiting_pkd.dst_drone
                         best_next_hop_id = self.neighbor_table.best_neighbor(self.my_drone, dst_drone)
                         if best_next_hop_id != self.my_drone.identifier:
                             self.my_drone.transmitting_queue.put(waiting_pkd)
-                            self.my_drone.waiting_list.remove(waiting_pkd)
                         else:
-                            pass
+                            remaining.append(waiting_pkd)
+                self.my_drone.waiting_list[:] = remaining
             else:
                 break
 
@@ -7,29 +7,60 @@ from routing.olsr.olsr_routing_table import OlsrRoutingTable
 from utils import config
 
 class Olsr:
+    __slots__ = ('simulator', 'my_drone', '_my_id', 'rng_routing', 'table', '_channel_assign', 'hello_interval',
+                 'tc_interval', '_dispatch', '_hello_template', '_tc_template')
+
     def __init__(self, simulator, my_drone):
         self.simulator = simulator
         self.my_drone = my_drone
+        self._my_id = my_drone.identifier  # never changes, compared against on every routed packet
         self.rng_routing = random.Random(my_drone.identifier + simulator.seed + 10)
         self.table = OlsrRoutingTable(simulator.env, my_drone)
+        self._channel_assign = my_drone.channel_assigner.channel_assign  # bound once, called for every control packet
         self.hello_interval = 0.5 * 1e6
         self.tc_interval = 1.0 * 1e6
+        # the first HELLO/TC is built normally and serves as template for the following ones. It is not built here
+        # because the drones created after this one would be missing from its retransmission counters
+        self._hello_template = None
+        self._tc_template = None
+        # exact packet type -> handler, see "packet_reception"
+        self._dispatch = {
+            OlsrHelloPacket: self._on_hello,
+            OlsrTcPacket: self._on_tc,
+            DataPacket: self._on_data,
+            VfPacket: self._on_vf,
+        }
         self.simulator.env.process(self.broadcast_hello_periodically())
         self.simulator.env.process(self.broadcast_tc_periodically())
 
+    def _alloc_ids(self, counter):
+        """
+        Take the next value of a global packet id counter in config and assign a sub-channel
+        :param counter: name of the counter, e.g. "GL_ID_HELLO_PACKET"
+        :return: (packet id, channel id)
+        """
+
+        packet_id = getattr(config, counter) + 1
+        setattr(config, counter, packet_id)
+        return packet_id, self._channel_assign()
+
     def broadcast_hello(self):
-        config.GL_ID_HELLO_PACKET += 1
-        channel_id = self.my_drone.channel_assigner.channel_assign()
-        hello_pkd = OlsrHelloPacket(
-            src_drone=self.my_drone,
-            creation_time=self.simulator.env.now,
-            id_hello_packet=config.GL_ID_HELLO_PACKET,
-            hello_packet_length=config.HELLO_PACKET_LENGTH,
-            neighbors=list(self.table.neighbor_table.keys()),
-            simulator=self.simulator,
-            channel_id=channel_id
-        )
-        hello_pkd.transmission_mode = 1
+        hello_id, channel_id = self._alloc_ids('GL_ID_HELLO_PACKET')
+        neighbors = list(self.table.neighbor_table.keys())
+        if self._hello_template is not None:
+            hello_pkd = self._hello_template.renew_hello(hello_id, self.simulator.env.now, channel_id, neighbors)
+        else:
+            hello_pkd = OlsrHelloPacket(
+                src_drone=self.my_drone,
+                creation_time=self.simulator.env.now,
+                id_hello_packet=hello_id,
+                hello_packet_length=config.HELLO_PACKET_LENGTH,
+                neighbors=neighbors,
+                simulator=self.simulator,
+                channel_id=channel_id
+            )
+            hello_pkd.transmission_mode = 1
+            self._hello_template = hello_pkd
         self.my_drone.transmitting_queue.put(hello_pkd)
 
     def broadcast_hello_periodically(self):
@@ -38,18 +69,22 @@ class Olsr:
             yield self.simulator.env.timeout(self.hello_interval)
 
     def broadcast_tc(self):
-        config.GL_ID_TC_PACKET += 1
-        channel_id = self.my_drone.channel_assigner.channel_assign()
-        tc_pkd = OlsrTcPacket(
-            src_drone=self.my_drone,
-            creation_time=self.simulator.env.now,
-            id_tc_packet=config.GL_ID_TC_PACKET,
-            tc_packet_length=config.HELLO_PACKET_LENGTH,
-            mpr_selector_list=list(self.table.mpr_selector_set),
-            simulator=self.simulator,
-            channel_id=channel_id
-        )
-        tc_pkd.transmission_mode = 1
+        tc_id, channel_id = self._alloc_ids('GL_ID_TC_PACKET')
+        mpr_selector_list = list(self.table.mpr_selector_set)
+        if self._tc_template is not None:
+            tc_pkd = self._tc_template.renew_tc(tc_id, self.simulator.env.now, channel_id, mpr_selector_list)
+        else:
+            tc_pkd = OlsrTcPacket(
+                src_drone=self.my_drone,
+                creation_time=self.simulator.env.now,
+                id_tc_packet=tc_id,
+                tc_packet_length=config.HELLO_PACKET_LENGTH,
+                mpr_selector_list=mpr_selector_list,
+                simulator=self.simulator,
+                channel_id=channel_id
+            )
+            tc_pkd.transmission_mode = 1
+            self._tc_template = tc_pkd
         self.my_drone.transmitting_queue.put(tc_pkd)
 
     def broadcast_tc_periodically(self):
@@ -60,35 +95,64 @@ class Olsr:
     def next_hop_selection(self, packet):
         dst_drone = packet.dst_drone
         best_next_hop_id = self.table.best_next_hop(dst_drone.identifier)
-        has_route = best_next_hop_id != self.my_drone.identifier
+        has_route = best_next_hop_id != self._my_id
         packet.next_hop_id = best_next_hop_id
         return has_route, packet, False
 
+    def penalize(self, packet):
+        """Called by the MAC on an ACK timeout, the routes through the silent next hop are dropped"""
+
+        next_hop_id = packet.next_hop_id  # always set on data packets, None if no next hop was selected
+        if next_hop_id is None:
+            return
+        removed = self.table.invalidate_routes_through(next_hop_id)
+        logger.info('At time: %s (us) ---- UAV: %s removes %s route(s) through UAV: %s after an ACK timeout',
+                    self.simulator.env.now, self._my_id, removed, next_hop_id)
+
     def packet_reception(self, packet, src_drone_id):
         """
         Packet reception at network layer
         """
         current_time = self.simulator.env.now
 
-        if isinstance(packet, OlsrHelloPacket):
-            self.table.update_hello(packet, current_time)
-
-        elif isinstance(packet, OlsrTcPacket):
-            self.table.update_tc(packet, current_time)
+        # one dict lookup on the exact type instead of a chain of isinstance checks
+        packet_type = type(packet)
+        try:
+            handler = self._dispatch[packet_type]
+        except KeyError:
+            handler = self._dispatch[packet_type] = self._resolve_handler(packet_type)
 
-        elif isinstance(packet, DataPacket):
-            # If it's a data packet for me
-            if packet.dst_drone.identifier == self.my_drone.identifier:
-                self.simulator.metrics.calculate_metrics(packet)
-            else:
-                has_route, pkt, _ = self.next_hop_selection(packet)
-                if has_route:
-                    self.my_drone.transmitting_queue.put(pkt)
-
-        elif isinstance(packet, VfPacket):
-            # Handle virtual force (motion control)
-            self.my_drone.motion_controller.neighbor_table.add_neighbor(packet, current_time)
+        if handler is not None:
+            handler(packet, current_time)
 
         # make sure it yields at least once so SimPy treats it as a generator
         yield self.simulator.env.timeout(1)
 
+    def _resolve_handler(self, packet_type):
+        """Handler of a packet type that is not in the table yet (a subclass, or a type OLSR ignores)"""
+
+        for base, handler in ((OlsrHelloPacket, self._on_hello), (OlsrTcPacket, self._on_tc),
+                              (DataPacket, self._on_data), (VfPacket, self._on_vf)):
+            if issubclass(packet_type, base):
+                return handler
+        return None
+
+    def _on_hello(self, packet, current_time):
+        self.table.update_hello(packet, current_time)
+
+    def _on_tc(self, packet, current_time):
+        self.table.update_tc(packet, current_time)
+
+    def _on_data(self, packet, current_time):
+        # If it's a data packet for me
+        if packet.dst_drone.identifier == self._my_id:
+            self.simulator.metrics.calculate_metrics(packet)
+        else:
+            has_route, pkt, _ = self.next_hop_selection(packet)
+            if has_route:
+                self.my_drone.transmitting_queue.put(pkt)
+
+    def _on_vf(self, packet, current_time):
+        # Handle virtual force (motion control)
+        self.my_drone.motion_controller.neighbor_table.add_neighbor(packet, current_time)
+
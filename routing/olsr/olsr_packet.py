@@ -1,6 +1,9 @@
 from entities.packet import Packet
 
+
 class OlsrHelloPacket(Packet):
+    __slots__ = ('src_drone', 'neighbors', 'type')
+
     def __init__(self, src_drone, creation_time, id_hello_packet,
                  hello_packet_length, neighbors, simulator, channel_id):
         super().__init__(id_hello_packet, hello_packet_length, creation_time, simulator, channel_id)
@@ -8,11 +11,31 @@ class OlsrHelloPacket(Packet):
         self.neighbors = neighbors  # neighbor list to share
         self.type = 'HELLO'
 
+    def renew_hello(self, id_hello_packet, creation_time, channel_id, neighbors):
+        """Next HELLO of the same drone, built from this one, see "Packet.renew" """
+
+        hello = self.renew(id_hello_packet, creation_time, channel_id)
+        hello.src_drone = self.src_drone
+        hello.neighbors = neighbors
+        hello.type = 'HELLO'
+        return hello
+
 
 class OlsrTcPacket(Packet):
+    __slots__ = ('src_drone', 'mpr_selector_list', 'type')
+
     def __init__(self, src_drone, creation_time, id_tc_packet,
                  tc_packet_length, mpr_selector_list, simulator, channel_id):
         super().__init__(id_tc_packet, tc_packet_length, creation_time, simulator, channel_id)
         self.src_drone = src_drone
         self.mpr_selector_list = mpr_selector_list  # drones that selected me as MPR
         self.type = 'TC'
+
+    def renew_tc(self, id_tc_packet, creation_time, channel_id, mpr_selector_list):
+        """Next TC of the same drone, built from this one, see "Packet.renew" """
+
+        tc = self.renew(id_tc_packet, creation_time, channel_id)
+        tc.src_drone = self.src_drone
+        tc.mpr_selector_list = mpr_selector_list
+        tc.type = 'TC'
+        return tc
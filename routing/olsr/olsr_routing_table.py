@@ -1,11 +1,23 @@
-from collections import defaultdict
+from dataclasses import dataclass
 from simulator.log import logger
 
+
+@dataclass(slots=True)
+class OlsrRouteEntry:
+    next_hop: int
+    hops: int = 1
+    timestamp: float = 0.0
+
+
 class OlsrRoutingTable:
+    __slots__ = ('env', 'my_drone', '_my_id', 'routing_table', 'neighbor_table', 'mpr_set', 'mpr_selector_set',
+                 'entry_life_time')
+
     def __init__(self, env, my_drone):
         self.env = env
         self.my_drone = my_drone
-        self.routing_table = defaultdict(list)
+        self._my_id = my_drone.identifier  # returned by "best_next_hop" when there is no route
+        self.routing_table = {}  # dst id -> OlsrRouteEntry
         self.neighbor_table = {}
         self.mpr_set = set()
         self.mpr_selector_set = set()
@@ -16,15 +28,28 @@ class OlsrRoutingTable:
 
     def update_tc(self, packet, cur_time):
         for node in packet.mpr_selector_list:
-            self.routing_table[node] = [packet.src_drone.identifier, 1, cur_time]
+            self.routing_table[node] = OlsrRouteEntry(packet.src_drone.identifier, 1, cur_time)
 
     def purge(self):
         for key, last_time in list(self.neighbor_table.items()):
             if last_time + self.entry_life_time < self.env.now:
                 del self.neighbor_table[key]
 
+    def invalidate_routes_through(self, next_hop_id):
+        """
+        Remove the routes that use "next_hop_id" as next hop, they are learned again from the next TC message
+        :param next_hop_id: identifier of the neighbor that did not answer
+        :return: number of routes removed
+        """
+
+        stale = [dst_id for dst_id, entry in self.routing_table.items() if entry.next_hop == next_hop_id]
+        for dst_id in stale:
+            del self.routing_table[dst_id]
+        return len(stale)
+
     def best_next_hop(self, dst_id):
-        if dst_id in self.routing_table:
-            return self.routing_table[dst_id][0]
+        entry = self.routing_table.get(dst_id)
+        if entry is not None:
+            return entry.next_hop
         else:
-            return self.my_drone.identifier
+            return self._my_id
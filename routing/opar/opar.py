@@ -1,12 +1,11 @@
-import copy
 import math
 import numpy as np
 from simulator.log import logger
 from entities.packet import DataPacket, AckPacket
 from topology.virtual_force.vf_packet import VfPacket
 from utils import config
-from utils.util_function import euclidean_distance_3d
-from phy.large_scale_fading import maximum_communication_range
+from utils.util_function import squared_distance_3d
+from phy.large_scale_fading import MAX_COMM_RANGE, MAX_COMM_RANGE_SQUARED
 
 
 class Opar:
@@ -44,7 +43,7 @@ class Opar:
         self.w1 = 0.5
         self.w2 = 0.5
 
-        self.max_comm_range = maximum_communication_range()
+        self.max_comm_range = MAX_COMM_RANGE
         self.simulator.env.process(self.check_waiting_list())
 
     def calculate_cost_matrix(self):
@@ -56,7 +55,7 @@ class Opar:
                 drone1 = self.simulator.drones[i]
                 drone2 = self.simulator.drones[j]
 
-                if (i != j) and (euclidean_distance_3d(drone1.coords, drone2.coords) < self.max_comm_range):
+                if (i != j) and (squared_distance_3d(drone1.coords, drone2.coords) < MAX_COMM_RANGE_SQUARED):
                     cost[i, j] = 1
                     cost[j, i] = 1
 
@@ -224,7 +223,7 @@ class Opar:
 
         current_time = self.simulator.env.now
         if isinstance(packet, DataPacket):
-            packet_copy = copy.copy(packet)
+            packet_copy = packet.clone_for_forward()
 
             if packet_copy.dst_drone.identifier == self.my_drone.identifier:
                 if packet_copy.packet_id not in self.simulator.metrics.datapacket_arrived:
@@ -327,16 +326,17 @@ class Opar:
         while True:
             if not self.my_drone.sleep:
                 yield self.simulator.env.timeout(0.6 * 1e6)
+                remaining = []
                 for waiting_pkd in self.my_drone.waiting_list:
                     if self.simulator.env.now > waiting_pkd.creation_time + waiting_pkd.deadline:  # expired
-                        self.my_drone.waiting_list.remove(waiting_pkd)
+                        continue  # expired, not carried over to the next check
                     else:
                         best_next_hop_id = self.next_hop_selection(waiting_pkd)
                         if best_next_hop_id != self.my_drone.identifier:
                             self.my_drone.transmitting_queue.put(waiting_pkd)
-                            self.my_drone.waiting_list.remove(waiting_pkd)
                         else:
-                            pass
+                            remaining.append(waiting_pkd)
+                self.my_drone.waiting_list[:] = remaining
             else:
                 break
 
@@ -1,4 +1,3 @@
-import copy
 import random
 from simulator.log import logger
 from entities.packet import DataPacket
@@ -6,6 +5,7 @@ from topology.virtual_force.vf_packet import VfPacket
 from routing.q_routing.q_routing_packet import QRoutingHelloPacket, QRoutingAckPacket
 from routing.q_routing.q_routing_table import QRoutingTable
 from utils import config
+from utils.random_pool import hello_jitter_pool
 
 
 class QRouting:
@@ -57,6 +57,7 @@ class QRouting:
         self.simulator = simulator
         self.my_drone = my_drone
         self.rng_routing = random.Random(self.my_drone.identifier + self.my_drone.simulator.seed + 10)
+        self._hello_jitter = hello_jitter_pool(self.my_drone)
         self.hello_interval = 0.5 * 1e6  # broadcast hello packet every 0.5s
         self.check_interval = 0.6 * 1e6
         self.learning_rate = 0.5
@@ -87,7 +88,7 @@ class QRouting:
     def broadcast_hello_packet_periodically(self):
         while True:
             self.broadcast_hello_packet(self.my_drone)
-            jitter = self.rng_routing.randint(1000, 2000)  # delay jitter
+            jitter = self._hello_jitter.next()  # delay jitter
             yield self.simulator.env.timeout(self.hello_interval + jitter)
 
     def next_hop_selection(self, packet):
@@ -137,7 +138,7 @@ class QRouting:
             self.table.add_neighbor(packet, current_time)  # update the neighbor table
 
         elif isinstance(packet, DataPacket):
-            packet_copy = copy.copy(packet)
+            packet_copy = packet.clone_for_forward()
 
             packet_copy.previous_drone = self.simulator.drones[src_drone_id]
 
@@ -281,16 +282,17 @@ class QRouting:
         while True:
             if not self.my_drone.sleep:
                 yield self.simulator.env.timeout(self.check_interval)
+                remaining = []
                 for waiting_pkd in self.my_drone.waiting_list:
                     if self.simulator.env.now > waiting_pkd.creation_time + waiting_pkd.deadline:
-                        self.my_drone.waiting_list.remove(waiting_pkd)
+                        continue  # expired, not carried over to the next check
                     else:
                         has_route, packet, enquire = self.next_hop_selection(waiting_pkd)
                         if has_route:
                             self.my_drone.transmitting_queue.put(waiting_pkd)
-                            self.my_drone.waiting_list.remove(waiting_pkd)
                         else:
-                            pass
+                            remaining.append(waiting_pkd)
+                self.my_drone.waiting_list[:] = remaining
             else:
                 break
 
@@ -16,6 +16,7 @@ from entities.packet import DataPacket
 from routing.qfanet.qfanet_packet import QFanetHelloPacket, QFanetAckPacket
 from routing.qfanet.qfanet_table import QFanetTable
 from utils import config
+from utils.random_pool import hello_jitter_pool
 
 
 class QFanet:
@@ -30,6 +31,7 @@ class QFanet:
         self.simulator = simulator
         self.my_drone = my_drone
         self.rng_routing = random.Random(my_drone.identifier + simulator.seed + 20)
+        self._hello_jitter = hello_jitter_pool(my_drone, 20)
 
         self.hello_interval = 0.5 * 1e6
         self.check_interval = 0.6 * 1e6
@@ -73,7 +75,7 @@ class QFanet:
         """Broadcast hello packet periodically"""
         while True:
             self.broadcast_hello_packet()
-            jitter = self.rng_routing.randint(1000, 2000)
+            jitter = self._hello_jitter.next()
             yield self.simulator.env.timeout(self.hello_interval + jitter)
 
     def next_hop_selection(self, packet):
@@ -123,7 +125,7 @@ class QFanet:
                 current_time, self.my_drone.identifier, src_drone_id, current_sinr
             )
         elif isinstance(packet, DataPacket):
-            packet_copy = copy.copy(packet)
+            packet_copy = packet.clone_for_forward()
             dst_id = packet_copy.dst_drone.identifier
             sinr = self.cal_p2p_sinr(packet_copy, src_drone_id)
             sinr_eta = self.table.calculate_eta(sinr)  # sinr => eta
@@ -206,16 +208,17 @@ class QFanet:
         while True:
             if not self.my_drone.sleep:
                 yield self.simulator.env.timeout(self.check_interval)
+                remaining = []
                 for waiting_pkd in self.my_drone.waiting_list:
                     if self.simulator.env.now > waiting_pkd.creation_time + waiting_pkd.deadline:
-                        self.my_drone.waiting_list.remove(waiting_pkd)
+                        continue  # expired, not carried over to the next check
                     else:
                         has_route, packet, enquire = self.next_hop_selection(waiting_pkd)
                         if has_route:
                             self.my_drone.transmitting_queue.put(waiting_pkd)
-                            self.my_drone.waiting_list.remove(waiting_pkd)
                         else:
-                            pass
+                            remaining.append(waiting_pkd)
+                self.my_drone.waiting_list[:] = remaining
             else:
                 break
 
@@ -240,15 +243,14 @@ class QFanet:
 
     def get_current_transmitting_nodes(self):
         """Get all the nodes that are currently transmitting"""
-        transmitting_nodes = []
+        transmitting_nodes = set()  # removes the duplicates
+        now = self.env.now
         for drone in self.simulator.drones:
-            for item in drone.inbox:
-                packet = item[0]
-                insertion_time = item[1]
-                transmitter = item[2]
-                channel_used = item[4]
+            inbox = drone.inbox
+            for packet, insertion_time, transmitter, channel_used in zip(inbox.packet, inbox.send_time,
+                                                                         inbox.src, inbox.channel):
                 transmitting_time = packet.packet_length / config.BIT_RATE * 1e6
                 interval = [insertion_time, insertion_time + transmitting_time]
-                if has_intersection(interval, [self.env.now, self.env.now]):
-                    transmitting_nodes.append([transmitter, channel_used])
-        return [list(x) for x in {tuple(i) for i in transmitting_nodes}]
\ No newline at end of file
+                if has_intersection(interval, [now, now]):
+                    transmitting_nodes.add((transmitter, channel_used))
+        return list(transmitting_nodes)
\ No newline at end of file
@@ -13,8 +13,8 @@ import numpy as np
 from collections import defaultdict
 
 from utils import util_function
-from utils.util_function import euclidean_distance_3d
-from phy.large_scale_fading import maximum_communication_range
+from utils.util_function import euclidean_distance_3d, squared_distance_3d
+from phy.large_scale_fading import MAX_COMM_RANGE, MAX_COMM_RANGE_SQUARED
 
 
 class QFanetTable:
@@ -40,7 +40,7 @@ class QFanetTable:
 
         n_drones = my_drone.simulator.n_drones
         self.q_table = np.full((n_drones, n_drones), 0.5)  # 初始值0.5
-        self.max_comm_range = maximum_communication_range()
+        self.max_comm_range = MAX_COMM_RANGE
 
     def is_neighbor(self, drone_id):
         """Check if the drone is a neighbor"""
@@ -49,11 +49,11 @@ class QFanetTable:
         # check if the neighbor entry is expired
         if self.neighbor_table[drone_id][2] + self.entry_life_time <= self.env.now:
             return False
-        dist = euclidean_distance_3d(
+        dist_sq = squared_distance_3d(
             self.my_drone.coords,
             self.neighbor_table[drone_id][0]
         )
-        return dist <= self.max_comm_range
+        return dist_sq <= MAX_COMM_RANGE_SQUARED
 
     def add_neighbor(self, hello_packet, cur_time, cur_sinr):
         """Add neighbor to the table"""
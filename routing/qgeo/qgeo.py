@@ -1,4 +1,3 @@
-import copy
 import math
 import random
 from simulator.log import logger
@@ -8,7 +7,8 @@ from routing.qgeo.qgeo_packet import QGeoHelloPacket, QGeoAckPacket
 from routing.qgeo.qgeo_table import QGeoTable
 from utils import config
 from utils import util_function
-from phy.large_scale_fading import maximum_communication_range
+from phy.large_scale_fading import MAX_COMM_RANGE
+from utils.random_pool import hello_jitter_pool
 
 
 class QGeo:
@@ -39,6 +39,7 @@ class QGeo:
         self.simulator = simulator
         self.my_drone = my_drone
         self.rng_routing = random.Random(self.my_drone.identifier + self.my_drone.simulator.seed + 10)
+        self._hello_jitter = hello_jitter_pool(self.my_drone)
         self.hello_interval = 0.5 * 1e6  # broadcast hello packet periodically
         self.check_interval = 0.6 * 1e6
         self.learning_rate = 0.6  # fixed learning rate
@@ -71,7 +72,7 @@ class QGeo:
     def broadcast_hello_packet_periodically(self):
         while True:
             self.broadcast_hello_packet(self.my_drone)
-            jitter = self.rng_routing.randint(1000, 2000)  # delay jitter
+            jitter = self._hello_jitter.next()  # delay jitter
             yield self.simulator.env.timeout(self.hello_interval + jitter)
 
     def next_hop_selection(self, packet):
@@ -121,7 +122,7 @@ class QGeo:
             self.table.add_neighbor(packet, current_time)  # update the neighbor table
 
         elif isinstance(packet, DataPacket):
-            packet_copy = copy.copy(packet)
+            packet_copy = packet.clone_for_forward()
 
             packet_copy.previous_drone = self.simulator.drones[src_drone_id]
 
@@ -176,7 +177,7 @@ class QGeo:
                                                                         packet_copy.dst_drone.coords)
                         distance2 = util_function.euclidean_distance_3d(self.my_drone.coords,
                                                                         packet_copy.dst_drone.coords)
-                        reward = (distance1 - distance2) / maximum_communication_range()
+                        reward = (distance1 - distance2) / MAX_COMM_RANGE
                         max_q = self.table.get_max_q_value(packet_copy.dst_drone.identifier)
                     else:
                         reward = self.r_min
@@ -270,7 +271,7 @@ class QGeo:
         future_pos_next_hop = next_hop_coords + [i * t for i in next_hop_velocity]
         future_distance = util_function.euclidean_distance_3d(future_pos_myself, future_pos_next_hop)
 
-        if future_distance < maximum_communication_range():
+        if future_distance < MAX_COMM_RANGE:
             gamma = 0.6
         else:
             gamma = 0.4
@@ -283,16 +284,17 @@ class QGeo:
         while True:
             if not self.my_drone.sleep:
                 yield self.simulator.env.timeout(self.check_interval)
+                remaining = []
                 for waiting_pkd in self.my_drone.waiting_list:
                     if self.simulator.env.now > waiting_pkd.creation_time + waiting_pkd.deadline:
-                        self.my_drone.waiting_list.remove(waiting_pkd)
+                        continue  # expired, not carried over to the next check
                     else:
                         has_route, packet, enquire = self.next_hop_selection(waiting_pkd)
                         if has_route:
                             self.my_drone.transmitting_queue.put(waiting_pkd)
-                            self.my_drone.waiting_list.remove(waiting_pkd)
                         else:
-                            pass
+                            remaining.append(waiting_pkd)
+                self.my_drone.waiting_list[:] = remaining
             else:
                 break
 
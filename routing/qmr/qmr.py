@@ -1,4 +1,3 @@
-import copy
 import random
 from simulator.log import logger
 from entities.packet import DataPacket
@@ -7,6 +6,7 @@ from routing.qmr.history_packets_recorder import HistoryPacketsRecorder
 from routing.qmr.qmr_table import QMRTable
 from routing.qmr.qmr_packet import QMRHelloPacket, QMRAckPacket
 from utils import config
+from utils.random_pool import hello_jitter_pool
 
 
 class QMR:
@@ -28,6 +28,7 @@ class QMR:
         self.table = QMRTable(simulator.env, my_drone)
         self.history_packet_recorder = HistoryPacketsRecorder(self.simulator.n_drones)
         self.rng_routing = random.Random(self.my_drone.identifier + self.my_drone.simulator.seed + 10)
+        self._hello_jitter = hello_jitter_pool(self.my_drone)
 
         self.eps = 0.8  # epsilon-greedy
         self.hello_interval = 0.5 * 1e6  # broadcast hello packet periodically
@@ -74,7 +75,7 @@ class QMR:
 
         while True:
             self.broadcast_hello_packet(self.my_drone)
-            jitter = self.rng_routing.randint(1000, 2000)  # delay jitter
+            jitter = self._hello_jitter.next()  # delay jitter
             yield self.simulator.env.timeout(self.hello_interval + jitter)
 
     def next_hop_selection(self, packet):
@@ -133,7 +134,7 @@ class QMR:
             self.history_packet_recorder.add_received_hello_packet(packet)
 
         elif isinstance(packet, DataPacket):
-            packet_copy = copy.copy(packet)
+            packet_copy = packet.clone_for_forward()
             packet_copy.previous_drone = self.simulator.drones[src_drone_id]
             queuing_delay = packet_copy.transmitting_start_time - packet_copy.waiting_start_time
             
@@ -219,17 +220,18 @@ class QMR:
         while True:
             if not self.my_drone.sleep:
                 yield self.simulator.env.timeout(0.6 * 1e6)
+                remaining = []
                 for waiting_pkd in self.my_drone.waiting_list:
-                    if self.simulator.env.now < waiting_pkd.creation_time + waiting_pkd.deadline:
-                        self.my_drone.waiting_list.remove(waiting_pkd)
+                    if self.simulator.env.now > waiting_pkd.creation_time + waiting_pkd.deadline:
+                        continue  # expired, not carried over to the next check
                     else:
                         dst_drone = waiting_pkd.dst_drone
                         best_next_hop_id = self.table.make_route_decision(waiting_pkd, dst_drone, self.eps)
                         if best_next_hop_id != self.my_drone.identifier:
                             self.my_drone.transmitting_queue.put(waiting_pkd)
-                            self.my_drone.waiting_list.remove(waiting_pkd)
                         else:
-                            pass
+                            remaining.append(waiting_pkd)
+                self.my_drone.waiting_list[:] = remaining
             else:
                 break
 
@@ -177,20 +177,17 @@ class QMRTable:
         Returns: actual velocity of the data packet
         """
 
-        pos_x_j = self.neighbor_table[neighbor_id]["recorded_pos"][0]
-        pos_y_j = self.neighbor_table[neighbor_id]["recorded_pos"][1]
-        pos_z_j = self.neighbor_table[neighbor_id]["recorded_pos"][2]
-        v_x_j = self.neighbor_table[neighbor_id]["recorded_vel"][0]
-        v_y_j = self.neighbor_table[neighbor_id]["recorded_vel"][1]
-        v_z_j = self.neighbor_table[neighbor_id]["recorded_vel"][2]
+        entry = self.neighbor_table[neighbor_id]  # looked up once, the fields below are read from it
+        pos_x_j, pos_y_j, pos_z_j = entry["recorded_pos"][:3]
+        v_x_j, v_y_j, v_z_j = entry["recorded_vel"][:3]
 
         # "t1" is the updated time of this entry
-        t1 = self.neighbor_table[neighbor_id]["updated_time"]
+        t1 = entry["updated_time"]
 
         # "t2" is the current moment
         t2 = cur_time
 
-        delay = self.neighbor_table[neighbor_id]["delay"]
+        delay = entry["delay"]
 
         t3 = t2 + delay
 
@@ -306,15 +303,16 @@ class QMRTable:
         elif f == 1:
             reward = 10
         else:
-            delay = self.neighbor_table[next_hop_id]["delay"] / 1e6
-            neighbor_energy_factor = self.neighbor_table[next_hop_id]["remain_energy"] / config.INITIAL_ENERGY
+            entry = self.neighbor_table[next_hop_id]
+            delay = entry["delay"] / 1e6
+            neighbor_energy_factor = entry["remain_energy"] / config.INITIAL_ENERGY
             reward = self.omega * np.exp(-delay) + (1 - self.omega) * neighbor_energy_factor
         return reward
 
     def get_max_q(self):
         if len(self.neighbor_table) == 0:
             return 0
-        return max([self.neighbor_table[neighbor_id]["q_value"] for neighbor_id in self.neighbor_table.keys()])
+        return max(entry["q_value"] for entry in self.neighbor_table.values())
 
     def filter_space_of_exploration(self, packet, destination, cur_time):
 
@@ -335,7 +333,7 @@ class QMRTable:
             actual_velocity = self.compute_actual_velocity_3d(neighbor_id, cur_time, dist_to_dest, destination.coords)
 
             actual_velocity_dict[neighbor_id] = actual_velocity
-            self.neighbor_table[neighbor_id]["actual_velocity"] = actual_velocity
+            neighbor_entry["actual_velocity"] = actual_velocity
 
             if actual_velocity < required_velocity:
                 sub_candidate_neighbors.append((neighbor_id, actual_velocity))
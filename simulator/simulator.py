@@ -22,6 +22,7 @@ class Simulator:
         total_simulation_time: discrete time steps, in nanosecond
         n_drones: number of the drones
         channel_states: a dictionary, used to describe the channel usage
+        channel_bitmap: ChannelBitmap mirroring "channel_states", None if the plain simpy.Resource are used
         channel: wireless channel
         metrics: Metrics class, used to record the network performance
         drones: a list, contains all drone instances
@@ -36,7 +37,8 @@ class Simulator:
                  env,
                  channel_states,
                  n_drones,
-                 total_simulation_time=config.SIM_TIME):
+                 total_simulation_time=config.SIM_TIME,
+                 channel_bitmap=None):
 
         self.env = env
         self.seed = seed
@@ -44,6 +46,7 @@ class Simulator:
 
         self.n_drones = n_drones  # total number of drones in the simulation
         self.channel_states = channel_states
+        self.channel_bitmap = channel_bitmap
         self.channel = Channel(self.env)
 
         self.metrics = Metrics(self)  # use to record the network performance
@@ -0,0 +1,91 @@
+import simpy
+
+
+class ChannelBitmap:
+    """
+    Description: channel usage of all drones packed into a single integer, bit "i" is set when drone "i" occupies
+    its channel
+
+    Checking whether any drone is transmitting, or which drones are, no longer requires walking through the
+    per-drone simpy.Resource objects and their user lists.
+
+    Attributes:
+        n_drones: number of the drones
+        bits: the bitmap itself, a Python int
+    """
+
+    __slots__ = ('n_drones', 'bits')
+
+    def __init__(self, n_drones):
+        self.n_drones = n_drones
+        self.bits = 0
+
+    def try_acquire(self, node_id):
+        """
+        Mark the channel of "node_id" as occupied if it is idle
+        :param node_id: identifier of the drone
+        :return: True if the channel was idle and is now occupied, False if it was already occupied
+        """
+
+        mask = 1 << node_id
+        if self.bits & mask:
+            return False
+        self.bits |= mask
+        return True
+
+    def release(self, node_id):
+        """Mark the channel of "node_id" as idle"""
+
+        self.bits &= ~(1 << node_id)
+
+    def is_busy(self, node_id):
+        return (self.bits >> node_id) & 1 == 1
+
+    def busy_ids(self):
+        """
+        Iterate over the drones currently occupying their channel, lowest id first
+        :return: generator of drone identifiers
+        """
+
+        bits = self.bits
+        while bits:
+            low = bits & -bits
+            yield low.bit_length() - 1
+            bits ^= low
+
+    def __bool__(self):
+        return self.bits != 0
+
+
+class ChannelResource(simpy.Resource):
+    """
+    Description: single-capacity simpy.Resource that mirrors its occupancy into a ChannelBitmap
+
+    The Resource is still what serializes the transmissions of one drone (a retransmission can contend with the
+    next packet of the queue), the bitmap bit is set exactly while "users" is not empty.
+    """
+
+    def __init__(self, env, bitmap, node_id, capacity=1):
+        super().__init__(env, capacity=capacity)
+        self.bitmap = bitmap
+        self.node_id = node_id
+
+    def _sync(self, event=None):
+        if self.users:
+            self.bitmap.try_acquire(self.node_id)
+        else:
+            self.bitmap.release(self.node_id)
+
+    def request(self):
+        # an idle channel is granted synchronously, otherwise the request waits in the queue and is granted by the
+        # release that frees the channel, see "release"
+        req = super().request()
+        self._sync()
+        return req
+
+    def release(self, request):
+        rel = super().release(request)
+        self._sync()
+        # a queued request is granted when "rel" is processed, after simpy's own callback
+        rel.callbacks.append(self._sync)
+        return rel
@@ -0,0 +1,48 @@
+import numpy as np
+
+
+class UniformIntPool:
+    """
+    Description: integers drawn uniformly from [low, high] (both included, like "random.randint") in batches by
+    numpy and handed out one at a time
+
+    Used by the periodic processes that need one random value on every tick, e.g. the jitter of the hello interval,
+    so the generator is called once per "batch_size" ticks instead of once per tick.
+
+    Attributes:
+        low: smallest value
+        high: largest value
+        batch_size: number of values drawn at once
+    """
+
+    __slots__ = ('_rng', 'low', 'high', 'batch_size', '_pool', '_idx')
+
+    def __init__(self, seed, low, high, batch_size=1024):
+        self._rng = np.random.default_rng(seed)
+        self.low = low
+        self.high = high
+        self.batch_size = batch_size
+        self._refill()
+
+    def _refill(self):
+        # a list of Python ints, indexing it is cheaper than indexing a numpy array
+        self._pool = self._rng.integers(self.low, self.high, size=self.batch_size, endpoint=True).tolist()
+        self._idx = 0
+
+    def next(self):
+        if self._idx == self.batch_size:
+            self._refill()
+        value = self._pool[self._idx]
+        self._idx += 1
+        return value
+
+
+def hello_jitter_pool(drone, seed_offset=10):
+    """
+    Pool of the hello-interval jitter of a routing protocol, in microseconds within [1000, 2000]
+    :param drone: the drone running the protocol, its identifier and the simulator seed make the pool seed
+    :param seed_offset: added to the seed, the same offset the protocol uses for its "rng_routing"
+    :return: UniformIntPool
+    """
+
+    return UniformIntPool(drone.identifier + drone.simulator.seed + seed_offset, 1000, 2000)
@@ -14,6 +14,21 @@ def euclidean_distance_3d(p1, p2):
     return dist
 
 
+def squared_distance_3d(p1, p2):
+    """
+    Calculate the squared 3-D Euclidean distance between two nodes, compared against a squared range it avoids the
+    square root of "euclidean_distance_3d"
+    :param p1: the first point
+    :param p2: the second point
+    :return: squared Euclidean distance between p1 and p2
+    """
+
+    dx = p1[0] - p2[0]
+    dy = p1[1] - p2[1]
+    dz = p1[2] - p2[2]
+    return dx * dx + dy * dy + dz * dz
+
+
 def euclidean_distance_2d(p1, p2):
     """
     Calculate the 2-D Euclidean distance between two nodes
@@ -53,17 +68,25 @@ def has_intersection(interval1, interval2):
 def check_channel_availability(channel_states, sender_drone, drones):
     """
     Check if the channel is busy or idle
-    :param channel_states: a dictionary, indicates the use of the channel by different drones
+    :param channel_states: a ChannelBitmap, or a dictionary of simpy.Resource, indicates the use of the channel by
+                           different drones
     :param sender_drone: the drone that is about to send packet
     :param drones: a list, which contains all the drones in the simulation
     :return: if the channel is busy, return "False", else, return "True"
     """
 
-    for node_id in channel_states.keys():
-        if len(channel_states[node_id].users) != 0:
-            if node_id != sender_drone.identifier:
-                d = euclidean_distance_3d(sender_drone.coords, drones[node_id].coords)
-                if d < config.SENSING_RANGE:
-                    return False
+    if hasattr(channel_states, 'busy_ids'):
+        if not channel_states:  # nobody occupies the channel
+            return True
+        # only the drones whose bit is set need to be checked
+        busy_ids = channel_states.busy_ids()
+    else:
+        busy_ids = (node_id for node_id in channel_states.keys() if len(channel_states[node_id].users) != 0)
+
+    for node_id in busy_ids:
+        if node_id != sender_drone.identifier:
+            d = euclidean_distance_3d(sender_drone.coords, drones[node_id].coords)
+            if d < config.SENSING_RANGE:
+                return False
 
     return True
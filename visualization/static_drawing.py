@@ -2,8 +2,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 from utils import config
-from utils.util_function import euclidean_distance_3d
-from phy.large_scale_fading import maximum_communication_range
+from utils.util_function import squared_distance_3d
+from phy.large_scale_fading import MAX_COMM_RANGE_SQUARED
 
 
 def scatter_plot(simulator):
@@ -16,8 +16,8 @@ def scatter_plot(simulator):
         for drone2 in simulator.drones:
             if drone1.identifier != drone2.identifier:
                 ax.scatter(drone1.coords[0], drone1.coords[1], drone1.coords[2], c='red', s=30)
-                distance = euclidean_distance_3d(drone1.coords, drone2.coords)
-                if distance <= maximum_communication_range():
+                distance_sq = squared_distance_3d(drone1.coords, drone2.coords)
+                if distance_sq <= MAX_COMM_RANGE_SQUARED:
                     x = [drone1.coords[0], drone2.coords[0]]
                     y = [drone1.coords[1], drone2.coords[1]]
                     z = [drone1.coords[2], drone2.coords[2]]